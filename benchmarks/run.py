@@ -0,0 +1,210 @@
+"""Benchmarks du cœur analytique sur des séries synthétiques de 1e3 à 1e7 lignes.
+
+Pour chaque étape (chargement, statistiques, index par intervalle, évolution,
+agrégats, statistiques glissantes, classification, exports, graphique), mesure
+le temps (meilleur de plusieurs essais), le pic mémoire (tracemalloc) et, pour
+le graphique, le poids du JSON envoyé au navigateur.
+
+Usage (depuis la racine du dépôt) :
+
+    python -m benchmarks.run                      # toutes les tailles, affiche les résultats
+    python -m benchmarks.run --sizes 1e3 1e5      # tailles choisies
+    python -m benchmarks.run --update             # enregistre la référence
+    python -m benchmarks.run --check              # échoue (code 1) en cas de régression
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from streamlit.logger import set_log_level
+
+# Les fonctions mises en cache signalent l'absence de serveur Streamlit : sans intérêt ici
+set_log_level("error")
+
+from core.charts import growth_bar_trace, line_trace
+from core.classification import batch_growth
+from core.export import EXCEL_MAX_ROWS, csv_gzip_bytes, excel_bytes, parquet_bytes
+from core.generator import generate_sales
+from core.growth import GrowthTable
+from core.loader import IncrementalDataset, sidecar_path
+from core.range_index import RangeStatsIndex
+from core.rolling import rolling_frame
+from core.rollups import Rollups
+from core.stats import summarize
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+THRESHOLDS = (20, 5, -5, -20)
+
+# Tolérances avant de signaler une régression (les temps sont bruités)
+TIME_TOLERANCE = 1.0
+TIME_FLOOR = 0.02
+MEMORY_TOLERANCE = 0.25
+MEMORY_FLOOR_MB = 1.0
+PAYLOAD_TOLERANCE = 0.1
+
+
+def synthetic(n_rows, seed=0):
+    """Série quotidienne de ``n_rows`` lignes (plusieurs magasins au-delà de 2000-2024)."""
+    days = int((np.datetime64("2024-01-01") - np.datetime64("2000-01-01")).astype(int))
+    n_series = -(-n_rows // days)
+    end = np.datetime64("2000-01-01") + min(n_rows, days)
+    df = generate_sales(start="2000-01-01", end=str(end), freq="daily",
+                        n_series=n_series, seed=seed)
+    return df.head(n_rows)[["Date", "Sales Revenue"]].reset_index(drop=True)
+
+
+def yearly_table(n_rows, years=10, seed=0):
+    """Tableau (entités x années) de ``n_rows`` cellules pour la classification."""
+    rng = np.random.default_rng(seed)
+    n_entities = max(n_rows // years, 1)
+    table = pd.DataFrame(rng.uniform(0, 1e6, size=(n_entities, years)),
+                         columns=[str(2014 + year) for year in range(years)])
+    table.insert(0, "Magasin", np.arange(n_entities))
+    return table
+
+
+def chart_payload(df):
+    """Taille (octets) de la figure de la page demo : CA décimé + barres d'évolution."""
+    _, view = Rollups.from_frame(df).chart_frame()
+    growth = GrowthTable.from_frame(df).window(3)
+    fig = go.Figure()
+    fig.add_trace(line_trace(view["Date"], view["Sales Revenue"], name="CA"))
+    fig.add_trace(growth_bar_trace(growth["Date"], growth["Évolution"], name="Évolution du CA"))
+    return len(fig.to_json())
+
+
+def stages(df, csv_path):
+    """Étapes mesurées : nom -> fonction sans argument."""
+    index = RangeStatsIndex.from_frame(df)
+    # Bornes en nanosecondes : les requêtes sont tirées en entiers dans cette unité
+    dates = pd.to_datetime(df["Date"].iloc[[0, -1]]).to_numpy(dtype="datetime64[ns]")
+    rng = np.random.default_rng(0)
+    queries = np.sort(rng.integers(dates[0].astype("int64"), dates[1].astype("int64"),
+                                   size=(100, 2)), axis=1).astype("datetime64[ns]")
+    table = yearly_table(len(df))
+    days = Rollups.from_frame(df).day_totals()
+
+    # Chargement tel que le font les pages (core.loader.load_incremental) : lecture,
+    # statistiques, agrégats et évolution, à froid depuis le CSV ou depuis sa copie Parquet
+    def load_csv():
+        if os.path.exists(sidecar_path(csv_path)):
+            os.remove(sidecar_path(csv_path))
+        return IncrementalDataset(csv_path).refresh()
+
+    def load_parquet():
+        return IncrementalDataset(csv_path).refresh()
+
+    result = {
+        "load_csv": load_csv,
+        "load_parquet": load_parquet,
+        "summarize": lambda: summarize(df),
+        "range_index_build": lambda: RangeStatsIndex.from_frame(df),
+        "range_index_100_queries": lambda: [index.summary(start, end) for start, end in queries],
+        "growth_table": lambda: GrowthTable.from_frame(df),
+        "rollups": lambda: Rollups.from_frame(df),
+        "rolling_30d": lambda: rolling_frame(days, 30),
+        "batch_growth": lambda: batch_growth(table, "Magasin", THRESHOLDS),
+        "export_parquet": lambda: parquet_bytes(df),
+        "export_csv_gzip": lambda: csv_gzip_bytes(df),
+        "chart": lambda: chart_payload(df),
+    }
+    if len(df) < EXCEL_MAX_ROWS:
+        result["export_excel"] = lambda: excel_bytes(df)
+    return result
+
+
+def measure(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    value = function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 2**20, value
+
+
+def run(sizes, only=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            df = synthetic(size)
+            csv_path = os.path.join(directory, f"series_{size}.csv")
+            df.to_csv(csv_path, index=False)
+            repeat = 3 if size < 1_000_000 else 1
+            for name, function in stages(df, csv_path).items():
+                if only and name not in only:
+                    continue
+                seconds, peak_mb, value = measure(function, repeat)
+                record = {"seconds": round(seconds, 6), "peak_mb": round(peak_mb, 3)}
+                if name == "chart":
+                    record["payload_bytes"] = value
+                results[f"{name}[{size}]"] = record
+                print(f"{name:>24} {size:>10,} rows  {seconds * 1000:10.1f} ms  "
+                      f"{peak_mb:9.1f} MB" + (f"  {value:,} B" if name == "chart" else ""),
+                      flush=True)
+    return results
+
+
+def regressions(results, baseline):
+    """Liste des mesures plus mauvaises que la référence, au-delà des tolérances."""
+    found = []
+    for key, record in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if record["seconds"] > max(reference["seconds"] * (1 + TIME_TOLERANCE),
+                                   reference["seconds"] + TIME_FLOOR):
+            found.append(f"{key}: {reference['seconds']:.4f} s -> {record['seconds']:.4f} s")
+        if record["peak_mb"] > max(reference["peak_mb"] * (1 + MEMORY_TOLERANCE),
+                                   reference["peak_mb"] + MEMORY_FLOOR_MB):
+            found.append(f"{key}: {reference['peak_mb']:.1f} MB -> {record['peak_mb']:.1f} MB")
+        if "payload_bytes" in reference and record["payload_bytes"] > reference["payload_bytes"] * (1 + PAYLOAD_TOLERANCE):
+            found.append(f"{key}: {reference['payload_bytes']:,} B -> {record['payload_bytes']:,} B")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=SIZES,
+                        help="nombres de lignes (ex: 1e3 1e5)")
+    parser.add_argument("--stages", nargs="+", help="étapes à mesurer (toutes par défaut)")
+    parser.add_argument("--baseline", default=BASELINE, help="fichier de référence JSON")
+    parser.add_argument("--update", action="store_true", help="enregistre les résultats comme référence")
+    parser.add_argument("--check", action="store_true", help="échoue en cas de régression")
+    args = parser.parse_args(argv)
+
+    results = run([int(size) for size in args.sizes], args.stages)
+
+    if args.update:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file)
+        baseline.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump(dict(sorted(baseline.items())), file, indent=2)
+            file.write("\n")
+        print(f"Référence mise à jour : {args.baseline}")
+    if args.check:
+        with open(args.baseline) as file:
+            found = regressions(results, json.load(file))
+        if found:
+            print("Régressions :", *found, sep="\n  ")
+            return 1
+        print("Aucune régression.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
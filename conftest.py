@@ -0,0 +1,9 @@
+"""Configuration de pytest (tests du cœur analytique, voir ``tests/``).
+
+Ce fichier à la racine place le dépôt dans ``sys.path`` : ``core`` s'importe
+sans installation, comme depuis les pages.
+"""
+from streamlit.logger import set_log_level
+
+# Les fonctions mises en cache signalent l'absence de serveur Streamlit : sans intérêt ici
+set_log_level("error")
@@ -0,0 +1,20 @@
+"""Cœur analytique des pages Streamlit : chargement, schéma typé, statistiques,
+évolution, agrégats, classification, graphiques et exports.
+
+Tout est importable (et mesurable, voir ``benchmarks/``) sans passer par
+l'interface ; les pages ne font qu'assembler ces fonctions.
+"""
+from core.classification import batch_growth, category_counts, classify_growth, describe_growth
+from core.export import csv_gzip_bytes, excel_bytes, parquet_bytes
+from core.generator import generate_chunks, generate_sales
+from core.growth import GrowthTable
+from core.ingest import merge_frames, read_upload, read_uploads
+from core.loader import dataset_key, load_dataset, load_incremental, load_range_index
+from core.profiling import RunProfiler
+from core.range_index import RangeStatsIndex
+from core.registry import freeze, session_resource, shared_frame
+from core.rolling import RollingStats, rolling_frame
+from core.rollups import Rollups
+from core.schema import normalize
+from core.stats import summarize
+from core.store import DatasetStore, StoredDataset
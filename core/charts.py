@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+# Nombre de points envoyés au navigateur par série : au-delà, l'écran n'affiche
+# pas plus de détail, seul le poids du JSON augmente.
+MAX_POINTS = 2000
+# Au-delà de ce nombre de points, les traces sont rendues en WebGL
+WEBGL_THRESHOLD = 5000
+
+
+def lttb_indices(y, n_out):
+    """Indices retenus par l'algorithme Largest-Triangle-Three-Buckets.
+
+    Les positions servent d'abscisses : la série est supposée triée par date.
+    Le premier et le dernier point sont toujours conservés.
+    """
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Moyenne de chaque seau, utilisée comme troisième sommet du triangle
+    sums = np.add.reduceat(np.nan_to_num(y[1:n - 1]), edges[:-1] - 1)
+    counts = np.diff(edges)
+    means_x = (edges[:-1] + edges[1:] - 1) / 2
+    means_y = sums / counts
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < n_out - 2:
+            next_x, next_y = means_x[bucket + 1], means_y[bucket + 1]
+        else:
+            next_x, next_y = n - 1, y[n - 1]
+        xs = np.arange(start, stop)
+        areas = np.abs((previous - next_x) * (y[start:stop] - y[previous])
+                       - (previous - xs) * (next_y - y[previous]))
+        previous = start + int(np.nanargmax(areas)) if np.isfinite(areas).any() else start
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Indices du minimum et du maximum de chaque seau (n_out // 2 seaux), triés."""
+    y = np.asarray(y, dtype="float64")
+    n = len(y)
+    buckets = max(n_out // 2, 1)
+    if n <= n_out:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    width = int(np.diff(edges).max())
+    # Seaux complétés par NaN pour un calcul vectorisé de argmin / argmax
+    padded = np.full((buckets, width), np.nan)
+    positions = np.arange(n) - np.repeat(edges[:-1], np.diff(edges))
+    padded[np.repeat(np.arange(buckets), np.diff(edges)), positions] = y
+    finite = np.isfinite(padded)
+    low = np.where(finite, padded, np.inf).argmin(axis=1)
+    high = np.where(finite, padded, -np.inf).argmax(axis=1)
+    return np.unique(np.concatenate([edges[:-1] + low, edges[:-1] + high]))
+
+
+def decimation_indices(y, max_points=MAX_POINTS, method="lttb"):
+    """Indices des points conservés (tous si la série est déjà assez courte)."""
+    if len(y) <= max_points:
+        return np.arange(len(y))
+    return lttb_indices(y, max_points) if method == "lttb" else minmax_indices(y, max_points)
+
+
+def decimate(x, y, max_points=MAX_POINTS, method="lttb"):
+    """Réduit (x, y) à ``max_points`` points au plus en conservant les pics."""
+    x, y = np.asarray(x), np.asarray(y, dtype="float64")
+    if len(y) <= max_points:
+        return x, y
+    indices = decimation_indices(y, max_points, method)
+    return x[indices], y[indices]
+
+
+def line_trace(x, y, max_points=MAX_POINTS, **kwargs):
+    """Trace de ligne décimée, en WebGL quand la série est grande."""
+    trace = go.Scattergl if len(y) > WEBGL_THRESHOLD else go.Scatter
+    x, y = decimate(x, y, max_points)
+    return trace(x=x, y=y, mode="lines", **kwargs)
+
+
+def growth_bar_trace(x, y, max_points=MAX_POINTS, customdata=None, **kwargs):
+    """Barres d'évolution décimées (min / max par seau), vertes si positives, rouges sinon."""
+    y = np.asarray(y, dtype="float64")
+    indices = decimation_indices(y, max_points, method="minmax")
+    if customdata is not None:
+        kwargs["customdata"] = np.asarray(customdata)[indices]
+    y = y[indices]
+    return go.Bar(x=np.asarray(x)[indices], y=y, marker_color=np.where(y > 0, "green", "red"), **kwargs)
+
+
+def date_bounds(df, date_column="Date"):
+    """Première et dernière date du jeu de données (``datetime.date``)."""
+    dates = pd.to_datetime(df[date_column].iloc[[0, -1]] if df[date_column].is_monotonic_increasing
+                           else df[date_column].agg(["min", "max"]))
+    return dates.iloc[0].date(), dates.iloc[-1].date()
+
+
+def zoom(df, start, end, date_column="Date"):
+    """Lignes de ``df`` entre ``start`` et ``end`` inclus, pour ré-échantillonner la zone zoomée."""
+    if (start, end) == date_bounds(df, date_column):
+        return df
+    dates = df[date_column]
+    if pd.api.types.is_datetime64_any_dtype(dates.dtype):
+        # Dates typées (core.schema) : fin de période incluse jusqu'à la fin du jour
+        start, end = pd.Timestamp(start), pd.Timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+    else:
+        # Tables dérivées (agrégats, évolution) : dates au format AAAA-MM-JJ
+        start, end = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    if dates.is_monotonic_increasing:
+        return df.iloc[dates.searchsorted(start, side="left"):dates.searchsorted(end, side="right")]
+    return df[dates.between(start, end)]
+
+
+def zoom_range(df, key, label="Période affichée", date_column="Date"):
+    """Curseur de dates : renvoie la période choisie (début, fin).
+
+    Les graphiques étant décimés, zoomer sur une période via ce curseur puis
+    :func:`zoom` ré-échantillonne la zone à une résolution plus fine.
+    """
+    return date_slider(*date_bounds(df, date_column), key=key, label=label)
+
+
+def date_slider(first_date, last_date, key, label="Période affichée"):
+    """Curseur de dates entre deux bornes connues (voir :func:`zoom_range`)."""
+    if first_date >= last_date:
+        return first_date, last_date
+    return st.slider(label, min_value=first_date, max_value=last_date,
+                     value=(first_date, last_date), key=key)
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+# Catégories de taux de croissance, de la meilleure à la pire
+CATEGORIES = [
+    "Croissance élevée",
+    "Croissance modérée",
+    "Croissance faible",
+    "Stable",
+    "Déclin faible",
+    "Déclin modéré",
+    "Déclin important",
+]
+# Catégorie des taux non calculables (CA manquant ou nul l'année de référence)
+UNCLASSIFIED = "Non classé"
+
+
+def growth_rate(ca_reference, ca_current):
+    """Taux de croissance en %, NaN si le CA de référence est nul ou manquant."""
+    ca_reference = np.asarray(ca_reference, dtype="float64")
+    ca_current = np.asarray(ca_current, dtype="float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ca_reference != 0, (ca_current - ca_reference) / ca_reference * 100, np.nan)
+
+
+def classify_codes(percent, croissance_elevee, croissance_moderee, declin_faible, declin_modere):
+    """Indice dans ``CATEGORIES + [UNCLASSIFIED]`` de la catégorie de chaque taux (en %).
+
+    Applique les mêmes règles que la comparaison simple de la page year.py,
+    mais sur un tableau entier de taux à la fois.
+    """
+    percent = np.asarray(percent, dtype="float64")
+    conditions = [
+        percent > croissance_elevee,
+        percent > croissance_moderee,
+        percent > 0,
+        percent == 0,
+        percent > declin_faible,
+        percent > declin_modere,
+        np.isfinite(percent),
+    ]
+    return np.select(conditions, np.arange(len(CATEGORIES), dtype=np.int8),
+                     default=np.int8(len(CATEGORIES))).astype(np.int8)
+
+
+def classify_growth(percent, *thresholds):
+    """Catégorie de chaque taux de croissance selon les seuils (voir :func:`classify_codes`)."""
+    return np.asarray(CATEGORIES + [UNCLASSIFIED])[classify_codes(percent, *thresholds)]
+
+
+def describe_growth(year_reference, year_current, ca_reference, ca_current, thresholds):
+    """Taux, catégorie et message de la comparaison du CA entre deux années."""
+    percent = (ca_current - ca_reference) / ca_reference * 100
+    category = str(classify_growth(percent, *thresholds))
+    message = f"Le taux de croissance est de {percent:.2f} %, le taux de croissance est : {category}. "
+    if percent > 0:
+        message = f"Le chiffre d'affaires a augmenté de {ca_current - ca_reference:.2f} € entre {year_reference} et {year_current}. " + message
+    elif percent == 0:
+        message = f"Le chiffre d'affaires est resté stable entre {year_reference} et {year_current}. " + message
+    else:
+        message = f"Le chiffre d'affaires a diminué de {ca_reference - ca_current:.2f} € entre {year_reference} et {year_current}. " + message
+    return percent, category, message
+
+
+def year_columns(table):
+    """Colonnes de ``table`` dont le nom est une année (ex: 2022 ou "2022"), triées."""
+    years = {}
+    for column in table.columns:
+        text = str(column).strip()
+        if text.isdigit() and len(text) == 4:
+            years[int(text)] = column
+    return [years[year] for year in sorted(years)]
+
+
+def batch_growth(table, entity_column, thresholds):
+    """Croissance de chaque entité pour chaque paire d'années consécutives.
+
+    ``table`` contient une ligne par entité (magasin, produit, client...) et
+    une colonne de CA par année. ``thresholds`` donne les seuils
+    (croissance_elevee, croissance_moderee, declin_faible, declin_modere).
+    Renvoie une ligne par (entité, paire d'années).
+    """
+    columns = year_columns(table)
+    if len(columns) < 2:
+        raise ValueError("Le tableau doit contenir au moins deux colonnes d'années (ex: 2022, 2023).")
+    revenue = table[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+    years = np.array([int(str(column).strip()) for column in columns])
+    reference, current = revenue[:, :-1], revenue[:, 1:]
+    percent = growth_rate(reference, current)
+    n_entities, n_pairs = percent.shape
+    return pd.DataFrame({
+        entity_column: np.repeat(table[entity_column].to_numpy(), n_pairs),
+        "Année de référence": np.tile(years[:-1], n_entities),
+        "Année": np.tile(years[1:], n_entities),
+        "CA référence": reference.ravel(),
+        "CA": current.ravel(),
+        "Évolution": (current - reference).ravel(),
+        "Croissance (%)": percent.ravel(),
+        "Catégorie": pd.Categorical.from_codes(
+            classify_codes(percent.ravel(), *thresholds), CATEGORIES + [UNCLASSIFIED]),
+    })
+
+
+def category_counts(results):
+    """Nombre de lignes par catégorie (toutes les catégories, même vides)."""
+    return (results["Catégorie"].value_counts(sort=False)
+            .reindex(CATEGORIES + [UNCLASSIFIED], fill_value=0)
+            .rename_axis("Catégorie").reset_index(name="Nombre"))
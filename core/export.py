@@ -0,0 +1,135 @@
+import gzip
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import xlsxwriter
+
+# Nombre maximal de lignes d'une feuille Excel (en-tête compris)
+EXCEL_MAX_ROWS = 1_048_576
+# Origine des numéros de série des dates Excel
+EXCEL_EPOCH = np.datetime64("1899-12-30", "ns")
+
+FORMATS = {
+    "Excel (.xlsx)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "CSV compressé (.csv.gz)": ("csv.gz", "application/gzip"),
+}
+
+
+def _check_rows(df):
+    if len(df) >= EXCEL_MAX_ROWS:
+        raise ValueError(
+            f"{len(df):,} lignes dépassent la limite d'Excel ({EXCEL_MAX_ROWS - 1:,}) : "
+            "utilisez l'export Parquet ou CSV.")
+
+
+def _excel_dates(df, worksheet, date_format):
+    # Colonnes de dates converties d'un bloc en numéros de série Excel (jours depuis
+    # le 30/12/1899), affichés avec ``date_format`` : pas de conversion cellule par cellule
+    for position, column in enumerate(df.columns):
+        if pd.api.types.is_datetime64_any_dtype(df[column].dtype):
+            days = (df[column].to_numpy(dtype="datetime64[ns]") - EXCEL_EPOCH) / np.timedelta64(1, "D")
+            df = df.assign(**{column: days})
+            worksheet.set_column(position, position, 12, date_format)
+    return df
+
+
+def _blank_missing(df):
+    # Valeurs manquantes (NaN, NaT, NA) écrites en cellules vides plutôt qu'en erreurs #NUM! ;
+    # seules les colonnes qui en contiennent passent en objets
+    for column in df.columns:
+        missing = df[column].isna()
+        if missing.any():
+            df = df.assign(**{column: df[column].astype(object).where(~missing, None)})
+    return df
+
+
+def _write_sheet(workbook, df, sheet_name, series_name, chart_type):
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, list(df.columns))
+    df = _blank_missing(_excel_dates(df, worksheet, workbook.add_format({"num_format": "yyyy-mm-dd"})))
+    for row, values in enumerate(df.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row, 0, values)
+    if chart_type is None:
+        return
+    chart = workbook.add_chart({"type": chart_type})
+    series = {
+        "values": [sheet_name, 1, 1, len(df), 1],
+        "categories": [sheet_name, 1, 0, len(df), 0],
+    }
+    if series_name is not None:
+        series["name"] = series_name
+    chart.add_series(series)
+    worksheet.insert_chart(1, len(df.columns) + 1, chart)
+
+
+def workbook_bytes(sheets):
+    """Classeur Excel de plusieurs feuilles.
+
+    ``sheets`` est une liste de ``(df, sheet_name, series_name, chart_type)`` ;
+    chaque feuille reçoit un graphique de sa deuxième colonne, sauf si
+    ``chart_type`` vaut ``None``. Écrit en mode ``constant_memory``
+    d'xlsxwriter : les lignes sont vidées sur disque au fur et à mesure, la
+    mémoire ne dépend pas de la taille des tableaux.
+    """
+    for df, *_ in sheets:
+        _check_rows(df)
+    buffer = BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {"constant_memory": True, "nan_inf_to_errors": True})
+    for df, sheet_name, series_name, chart_type in sheets:
+        _write_sheet(workbook, df, sheet_name, series_name, chart_type)
+    workbook.close()
+    return buffer.getvalue()
+
+
+def excel_bytes(df, sheet_name="Données", series_name="CA", chart_type="line"):
+    """Classeur Excel des données avec un graphique de la deuxième colonne."""
+    return workbook_bytes([(df, sheet_name, series_name, chart_type)])
+
+
+def parquet_bytes(df):
+    buffer = BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def csv_gzip_bytes(df):
+    # Compression rapide : le but est d'alléger le téléchargement, pas de gagner le dernier octet
+    return gzip.compress(df.to_csv(index=False).encode("utf-8"), compresslevel=3)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def export_bytes(key, fmt, _df, sheet_name="Données", series_name="CA"):
+    """Contenu du fichier à télécharger, mis en cache par ``key`` (identifiant du jeu de données).
+
+    ``_df`` peut être une fonction sans argument qui renvoie les lignes : elles
+    ne sont alors lues que pour générer le fichier (jeux de l'entrepôt).
+    """
+    if callable(_df):
+        _df = _df()
+    extension = FORMATS[fmt][0]
+    if extension == "xlsx":
+        return excel_bytes(_df, sheet_name=sheet_name, series_name=series_name)
+    if extension == "parquet":
+        return parquet_bytes(_df)
+    return csv_gzip_bytes(_df)
+
+
+def export_button(key, df, label, file_name, fmt, sheet_name="Données", series_name="CA", rows=None):
+    """Bouton de téléchargement : le fichier n'est généré qu'au clic, puis mis en cache.
+
+    ``df`` est un DataFrame ou une fonction qui le renvoie (voir
+    :func:`export_bytes`) ; dans ce cas, ``rows`` donne son nombre de lignes.
+    """
+    extension, mime = FORMATS[fmt]
+    if extension == "xlsx" and (len(df) if rows is None else rows) >= EXCEL_MAX_ROWS:
+        st.warning("Trop de lignes pour Excel : choisissez le format Parquet ou CSV.")
+        return
+    st.download_button(
+        label=label,
+        data=lambda: export_bytes(key, fmt, df, sheet_name=sheet_name, series_name=series_name),
+        file_name=f"{file_name}.{extension}",
+        mime=mime,
+        on_click="ignore")
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from core.schema import DATE_DTYPE
+
+FREQUENCIES = ["irregular", "daily", "weekly", "monthly"]
+
+# Écart aléatoire (en jours) entre deux dates pour la fréquence "irregular"
+IRREGULAR_GAP = (28, 35)
+
+
+def _date_axis(start, end, freq, rng):
+    start = np.datetime64(pd.Timestamp(start).date(), "D")
+    end = np.datetime64(pd.Timestamp(end).date(), "D")
+    if end <= start:
+        return np.array([], dtype="datetime64[D]")
+    if freq == "daily":
+        return np.arange(start, end, dtype="datetime64[D]")
+    if freq == "weekly":
+        return np.arange(start, end, np.timedelta64(7, "D"))
+    if freq == "monthly":
+        # Même jour du mois que ``start``, ramené au dernier jour des mois plus courts (31 -> 29 février)
+        months = np.arange(start.astype("datetime64[M]"), end.astype("datetime64[M]") + 1)
+        first_days = months.astype("datetime64[D]")
+        month_lengths = (months + 1).astype("datetime64[D]") - first_days
+        day = start - start.astype("datetime64[M]").astype("datetime64[D]")
+        dates = first_days + np.minimum(day, month_lengths - np.timedelta64(1, "D"))
+        return dates[(dates >= start) & (dates < end)]
+    if freq == "irregular":
+        low, high = IRREGULAR_GAP
+        steps = int((end - start).astype(int) // low) + 1
+        gaps = rng.integers(low, high + 1, size=steps - 1)
+        dates = start + np.concatenate([[0], np.cumsum(gaps)]).astype("timedelta64[D]")
+        return dates[dates < end]
+    raise ValueError(f"Fréquence inconnue : {freq!r} (attendu : {', '.join(FREQUENCIES)})")
+
+
+def _phase(dates, freq):
+    # Position de chaque date dans le cycle de saisonnalité, dans l'unité de la fréquence
+    if freq in ("monthly", "irregular"):
+        return dates.astype("datetime64[M]").astype(np.int64)
+    if freq == "weekly":
+        return dates.astype(np.int64) // 7
+    return dates.astype(np.int64)
+
+
+def generate_chunks(start="2020-01-01", end="2024-01-01", freq="irregular",
+                    seasonality_period=12, seasonality_trend="Positive",
+                    n_series=1, seed=None, chunk_size=1_000_000):
+    """Génère des données de CA synthétiques par blocs d'au plus ``chunk_size`` lignes.
+
+    Le CA est un tirage uniforme entre 5000 et 20000 auquel s'ajoute une
+    saisonnalité sinusoïdale d'amplitude 1000 et de période
+    ``seasonality_period`` (exprimée en mois pour les fréquences "monthly" et
+    "irregular", en semaines ou en jours sinon). Avec ``n_series`` > 1, chaque
+    date est répétée pour chaque magasin (colonne ``Store``). La mémoire
+    utilisée est bornée par la taille d'un bloc, quel que soit le nombre total
+    de lignes.
+    """
+    if seasonality_period < 1:
+        raise ValueError("La période de saisonnalité doit être supérieure à zéro.")
+    rng = np.random.default_rng(seed)
+    dates = _date_axis(start, end, freq, rng)
+    sign = -1.0 if seasonality_trend == "Negative" else 1.0
+    seasonality = sign * 1000 * np.sin(
+        (_phase(dates, freq) % seasonality_period) * (2 * np.pi / seasonality_period))
+    stamps = dates.astype(DATE_DTYPE)
+    stores = pd.Categorical([f"Store {i + 1}" for i in range(n_series)])
+
+    total = len(dates) * n_series
+    for offset in range(0, total, chunk_size):
+        rows = np.arange(offset, min(offset + chunk_size, total))
+        date_pos = rows // n_series
+        revenue = rng.integers(5000, 20001, size=len(rows)) + seasonality[date_pos]
+        chunk = {"Date": stamps[date_pos], "Sales Revenue": revenue}
+        if n_series > 1:
+            # Colonne ajoutée en dernier : les exports Excel tracent la deuxième colonne (le CA)
+            chunk["Store"] = stores[rows % n_series]
+        yield pd.DataFrame(chunk)
+
+
+def generate_sales(**kwargs):
+    """Comme :func:`generate_chunks`, mais renvoie un seul DataFrame."""
+    chunks = list(generate_chunks(**kwargs))
+    if not chunks:
+        return pd.DataFrame({"Date": pd.Series(dtype=DATE_DTYPE), "Sales Revenue": pd.Series(dtype=float)})
+    return pd.concat(chunks, ignore_index=True)
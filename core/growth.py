@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.rollups import rollup_pyramid
+
+
+class GrowthTable:
+    """Évolution du CA mois par mois pour toutes les tailles de fenêtre.
+
+    La série est d'abord ramenée au mois calendaire (somme du CA du mois ; un
+    mois sans donnée vaut NaN), ce qui rend la fenêtre indépendante de
+    l'espacement des lignes. Les écarts et taux de croissance sont ensuite
+    calculés pour toutes les fenêtres de 1 à n - 1 mois en une seule opération
+    sur une matrice (mois x fenêtre) : changer de fenêtre revient à lire une
+    colonne.
+    """
+
+    def __init__(self, monthly):
+        self.months = monthly.index
+        self.revenue = monthly.to_numpy()
+        n = len(self.revenue)
+        windows = np.arange(1, max(n, 2))
+        # previous[m, w - 1] = CA du mois m - w (NaN avant le premier mois)
+        padded = np.concatenate([np.full(len(windows), np.nan), self.revenue])
+        previous = padded[len(windows) + np.arange(n)[:, None] - windows[None, :]]
+        self.delta = self.revenue[:, None] - previous
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.pct = np.where(previous != 0, self.delta / previous * 100, np.nan)
+
+    @classmethod
+    def from_frame(cls, df, date_column="Date", value_column="Sales Revenue"):
+        monthly = (pd.Series(df[value_column].to_numpy(dtype="float64"),
+                             index=pd.to_datetime(df[date_column]).to_numpy())
+                   .resample("MS").sum(min_count=1))
+        return cls(monthly)
+
+    @classmethod
+    def from_rollups(cls, rollups):
+        return cls(rollups.level("Mois")["sum"])
+
+    @property
+    def max_window(self):
+        return self.delta.shape[1]
+
+    def window(self, window_size):
+        """Évolution sur ``window_size`` mois : colonnes Date (AAAA-MM-01), Évolution, Croissance (%)."""
+        if 1 <= window_size <= self.max_window:
+            delta, pct = self.delta[:, window_size - 1], self.pct[:, window_size - 1]
+        else:
+            delta = pct = np.full(len(self.months), np.nan)
+        return pd.DataFrame({
+            "Date": self.months.strftime("%Y-%m-%d"),
+            "Évolution": delta,
+            "Croissance (%)": pct,
+        })
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def growth_table(key, _df):
+    """Table d'évolution de ``_df``, construite une fois par ``key`` (identifiant du jeu de données)."""
+    return GrowthTable.from_rollups(rollup_pyramid(key, _df))
@@ -0,0 +1,243 @@
+import io
+import os
+import time
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from core.schema import COLUMNS, DATE_DTYPE, ENTITY, Normalized, detect_date_format, invalid_rows_error, normalize
+
+# Nombre de lignes lues par bloc
+CHUNK_ROWS = 100_000
+
+# Lignes fusionnées et nombre de lignes remplacées par un fichier suivant, par fichier
+Merged = namedtuple("Merged", ["frame", "removed"])
+
+
+def _check_columns(found, name):
+    missing = [column for column in COLUMNS if column not in found]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans {name} : {', '.join(missing)}")
+
+
+def _chunk(dates, revenues, start):
+    # Cellules brutes d'un bloc, indexées par leur position dans la feuille
+    index = pd.RangeIndex(start, start + len(dates))
+    return pd.DataFrame({"Date": pd.Series(dates, index=index, dtype=object),
+                         "Sales Revenue": pd.Series(revenues, index=index, dtype=object)})
+
+
+def _size(upload):
+    size = getattr(upload, "size", None)
+    if size is None:
+        position = upload.tell()
+        size = upload.seek(0, 2)
+        upload.seek(position)
+    return size or 1
+
+
+def _normalize_chunks(chunks, errors):
+    # Type chaque bloc brut (indexé par la position de ses lignes) dès qu'il est lu : le
+    # format des dates écrites en texte est fixé par le premier bloc qui en contient
+    frames, rejected, date_format = [], [], None
+    for chunk in chunks:
+        if date_format is None:
+            date_format = detect_date_format(chunk["Date"])
+        typed = normalize(chunk, date_format=date_format)
+        frames.append(typed.frame)
+        rejected.append(typed.rejected)
+    rejected = pd.concat(rejected)
+    if errors == "raise" and len(rejected):
+        raise invalid_rows_error(rejected.index.to_numpy())
+    return Normalized(pd.concat(frames, ignore_index=True), rejected)
+
+
+def read_csv_stream(upload, progress=None, block_size=1 << 22, errors="drop"):
+    """Lit un CSV par blocs avec le moteur pyarrow, uniquement Date et Sales Revenue.
+
+    Chaque bloc est typé dès qu'il est lu, comme dans :func:`read_excel_stream` :
+    le CA est converti en float64 par pyarrow, ou, si une cellule du bloc
+    n'est pas numérique, par :func:`core.schema.normalize`, qui écarte les
+    lignes fautives (le fichier n'est jamais relu). Renvoie un
+    :data:`core.schema.Normalized` (lignes écartées avec leur position parmi
+    les lignes de données).
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import csv
+
+    size = _size(upload)
+    reader = csv.open_csv(
+        upload,
+        read_options=csv.ReadOptions(block_size=block_size),
+        convert_options=csv.ConvertOptions(
+            include_columns=COLUMNS,
+            column_types={"Date": pa.string(), "Sales Revenue": pa.string()},
+            strings_can_be_null=True),
+    )
+
+    def chunks():
+        read = 0
+        for batch in reader:
+            revenues = batch.column("Sales Revenue")
+            try:
+                revenues = pc.cast(revenues, pa.float64())
+            except pa.ArrowInvalid:
+                # Cellules non numériques : converties (et écartées) par normalize
+                pass
+            chunk = pd.DataFrame({"Date": batch.column("Date").to_pandas(), "Sales Revenue": revenues.to_pandas()})
+            chunk.index = pd.RangeIndex(read, read + len(chunk))
+            read += len(chunk)
+            yield chunk
+            if progress is not None:
+                progress(min(upload.tell() / size, 1.0))
+        if not read:
+            yield _chunk([], [], 0)
+
+    return _normalize_chunks(chunks(), errors)
+
+
+def read_excel_stream(upload, progress=None, chunk_rows=CHUNK_ROWS, errors="drop"):
+    """Lit la première feuille d'un XLSX ligne à ligne (openpyxl en lecture seule).
+
+    Chaque bloc de ``chunk_rows`` lignes est typé par :func:`core.schema.normalize`
+    dès qu'il est lu : seules les cellules du bloc en cours restent des objets
+    Python. Le format des dates écrites en texte est fixé par le premier bloc
+    qui en contient, pour toute la feuille. Renvoie un
+    :data:`core.schema.Normalized` (lignes écartées avec leur position dans la
+    feuille).
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(upload, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        _check_columns(header, "le fichier Excel")
+        date_index, revenue_index = (header.index(column) for column in COLUMNS)
+        total = max((sheet.max_row or 0) - 1, 1)
+
+        def chunks():
+            dates, revenues, read = [], [], 0
+            for row in rows:
+                dates.append(row[date_index] if date_index < len(row) else None)
+                revenues.append(row[revenue_index] if revenue_index < len(row) else None)
+                if len(dates) == chunk_rows:
+                    yield _chunk(dates, revenues, read)
+                    read += len(dates)
+                    dates, revenues = [], []
+                    if progress is not None:
+                        progress(min(read / total, 1.0))
+            if dates or not read:
+                yield _chunk(dates, revenues, read)
+
+        typed = _normalize_chunks(chunks(), errors)
+    finally:
+        workbook.close()
+    if progress is not None:
+        progress(1.0)
+    return typed
+
+
+def read_upload(upload, progress=None, errors="drop"):
+    """Lit un fichier importé (CSV ou XLSX) par blocs, sans charger les colonnes inutiles.
+
+    ``progress`` est appelé avec la fraction du fichier déjà lue (entre 0 et 1).
+    Renvoie un :data:`core.schema.Normalized` : les lignes typées et celles
+    écartées (``errors="raise"`` les refuse, voir :func:`core.schema.normalize`).
+    Lève ``ValueError`` si les colonnes Date ou Sales Revenue sont absentes ou
+    si le fichier est illisible (classeur Excel corrompu...).
+    """
+    name = getattr(upload, "name", "")
+    if name.lower().endswith(".xlsx"):
+        from openpyxl.utils.exceptions import InvalidFileException
+
+        try:
+            return read_excel_stream(upload, progress=progress, errors=errors)
+        except (zipfile.BadZipFile, InvalidFileException, KeyError) as error:
+            # Archive illisible ou incomplète : même erreur que les autres fichiers invalides
+            raise ValueError(f"Fichier Excel illisible : {str(error) or type(error).__name__}") from error
+    try:
+        return read_csv_stream(upload, progress=progress, errors=errors)
+    except KeyError as error:
+        raise ValueError(f"Colonnes manquantes dans le fichier CSV : {error}") from error
+
+
+def _read_file(name, data):
+    # Lecture d'un fichier importé (exécutée dans un thread du pool)
+    start = time.perf_counter()
+    upload = io.BytesIO(data)
+    upload.name = name
+    try:
+        df, rejected = read_upload(upload)
+    except Exception as error:
+        # Toute erreur propre à un fichier (classeur mal formé, type inattendu...) est
+        # signalée dans le rapport sans interrompre la lecture des autres
+        return name, None, {"Fichier": name, "Erreur": str(error) or type(error).__name__,
+                            "Durée (s)": round(time.perf_counter() - start, 3)}
+    return name, df, {"Fichier": name, "Lignes": len(df), "Lignes rejetées": len(rejected),
+                      "Durée (s)": round(time.perf_counter() - start, 3), "Erreur": ""}
+
+
+def read_uploads(uploads, workers=None, progress=None):
+    """Lit plusieurs fichiers importés en parallèle ; renvoie ``(frames, report)``.
+
+    Les fichiers sont lus dans un pool de threads, hors du thread de la page :
+    le moteur CSV de pyarrow libère le GIL, les lectures se recouvrent. (Pas
+    de pool de processus ici : Streamlit remplace ``__main__`` par le script
+    de la page, qu'un processus lancé par "spawn" réexécuterait.) ``frames``
+    associe le nom de chaque fichier lu à ses lignes typées ; ``report`` a
+    une ligne par fichier (lignes, lignes rejetées, durée, erreur).
+    ``progress`` est appelé avec la fraction des fichiers déjà lus.
+    """
+    files = [(upload.name, upload.getvalue()) for upload in uploads]
+    frames, rows = {}, []
+    with ThreadPoolExecutor(max_workers=workers or min(len(files), os.cpu_count() or 1) or 1) as pool:
+        futures = [pool.submit(_read_file, name, data) for name, data in files]
+        for future in as_completed(futures):
+            name, df, row = future.result()
+            if df is not None:
+                frames[name] = df
+            rows.append(row)
+            if progress is not None:
+                progress(len(rows) / len(files))
+    report = pd.DataFrame(rows, columns=["Fichier", "Lignes", "Lignes rejetées", "Durée (s)", "Erreur"])
+    return frames, report.sort_values("Fichier", ignore_index=True).astype(
+        {"Lignes": "Int64", "Lignes rejetées": "Int64"})
+
+
+def merge_frames(frames, by_file=False):
+    """Fusionne les lignes de plusieurs fichiers en une série triée par date ; renvoie un :data:`Merged`.
+
+    Sans ``by_file``, les fichiers sont des morceaux d'une même série (un par
+    mois...) : quand une date est présente dans plusieurs fichiers, seules
+    les lignes du dernier fichier (dans l'ordre des noms) qui la contient
+    sont gardées. Les lignes d'un même fichier ne sont jamais écartées (un
+    export de caisse peut avoir plusieurs lignes par jour). Avec
+    ``by_file``, chaque fichier est une série distincte (un par magasin) :
+    une colonne ``Fichier`` (catégorielle, :data:`core.schema.ENTITY`) est
+    ajoutée, gardée par l'entrepôt (:meth:`core.store.DatasetStore.ingest`),
+    et aucune ligne n'est écartée. ``removed`` donne, par fichier, le nombre de lignes remplacées
+    par un fichier suivant.
+    """
+    names = sorted(frames)
+    if not names:
+        empty = pd.DataFrame({"Date": pd.Series(dtype=DATE_DTYPE), "Sales Revenue": pd.Series(dtype="float64")})
+        return Merged(empty, pd.Series(dtype="int64"))
+    merged = pd.concat([frames[name] for name in names], ignore_index=True)
+    rank = np.repeat(np.arange(len(names)), [len(frames[name]) for name in names])
+    if by_file:
+        merged.insert(0, ENTITY, pd.Categorical.from_codes(rank, names))
+        keep = np.ones(len(merged), dtype=bool)
+    else:
+        # Rang du dernier fichier qui contient chaque date : les lignes des fichiers précédents sont remplacées
+        latest = pd.Series(rank).groupby(merged["Date"].to_numpy()).transform("max").to_numpy()
+        keep = rank == latest
+    removed = pd.Series(np.bincount(rank[~keep], minlength=len(names)), index=names, name="Lignes remplacées")
+    # Tri stable : à date égale, l'ordre des fichiers puis celui des lignes est conservé
+    merged = merged[keep].sort_values("Date", kind="stable")
+    return Merged(merged.reset_index(drop=True), removed)
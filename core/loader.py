@@ -0,0 +1,235 @@
+import io
+import os
+import threading
+import zlib
+from collections import namedtuple
+
+import pandas as pd
+import streamlit as st
+
+from core.growth import GrowthTable
+from core.range_index import RangeStatsIndex
+from core.registry import freeze, view
+from core.rollups import Rollups
+from core.schema import COLUMNS, DTYPES, normalize
+from core.stats import extend_summary, summarize
+
+
+def sidecar_path(path):
+    """Chemin du fichier Parquet associé au CSV (ex: times_series.parquet)."""
+    root, _ = os.path.splitext(path)
+    return root + ".parquet"
+
+
+def _signature(stat):
+    return {b"source_mtime_ns": str(stat.st_mtime_ns).encode(),
+            b"source_size": str(stat.st_size).encode()}
+
+
+# CRC32 du CSV, enregistré dans les métadonnées de la copie Parquet (voir IncrementalDataset)
+CHECKSUM_KEY = b"source_crc32"
+
+
+def _read_sidecar(path, signature):
+    # Le Parquet n'est valide que s'il a été écrit depuis la même version du CSV ;
+    # renvoie (lignes, CRC32 du CSV ou None)
+    try:
+        import pyarrow.parquet as pq
+        parquet_path = sidecar_path(path)
+        if not os.path.exists(parquet_path):
+            return None
+        metadata = pq.read_schema(parquet_path).metadata or {}
+        if any(metadata.get(key) != value for key, value in signature.items()):
+            return None
+        checksum = metadata.get(CHECKSUM_KEY)
+        return (pq.read_table(parquet_path, columns=COLUMNS).to_pandas(),
+                int(checksum) if checksum is not None else None)
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def _write_sidecar(df, path, metadata):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), **metadata})
+        # Écriture atomique pour ne jamais exposer un fichier partiel
+        tmp_path = sidecar_path(path) + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, sidecar_path(path))
+    except (ImportError, OSError):
+        pass
+
+
+def _read_dataset(path, stat):
+    # Lignes normalisées et CRC32 du CSV (None si la copie Parquet ne le connaît pas) ;
+    # le CSV n'est lu que si la copie Parquet est absente ou périmée
+    signature = _signature(stat)
+    cached = _read_sidecar(path, signature)
+    if cached is not None:
+        df, checksum = cached
+        return normalize(df).frame, checksum
+    df = normalize(pd.read_csv(path, usecols=COLUMNS, dtype=DTYPES)).frame
+    with open(path, "rb") as file:
+        checksum = _checksum(file, stat.st_size)
+    _write_sidecar(df, path, {**signature, CHECKSUM_KEY: str(checksum).encode()})
+    return df, checksum
+
+
+def read_dataset(path):
+    """Lit le CSV ``path`` (ou sa copie Parquet si elle est à jour), sans cache.
+
+    Les lignes sont normalisées par :func:`core.schema.normalize` (dates en
+    ``datetime64``, lignes invalides écartées) ; la copie Parquet est écrite
+    déjà typée.
+    """
+    return _read_dataset(path, os.stat(path))[0]
+
+
+def dataset_key(path):
+    """Identifiant d'une version du fichier : chemin, date de modification et taille."""
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+def load_dataset(path):
+    """Charge le jeu de données ``path`` (colonnes Date et Sales Revenue).
+
+    Les lignes sont lues une fois par processus et partagées entre les
+    sessions (voir :func:`load_incremental`) ; chaque appel renvoie une vue
+    que l'appelant peut modifier sans toucher aux données partagées. Au
+    premier chargement, une copie Parquet typée est écrite à côté du CSV pour
+    accélérer les démarrages à froid suivants.
+    """
+    return view(load_incremental(path).frame)
+
+
+# Une version du jeu de données et tout ce qui en est dérivé (jamais modifiés sur place)
+DatasetVersion = namedtuple("DatasetVersion", ["key", "frame", "stats", "rollups", "growth"])
+
+
+def _checksum(file, length, block_size=1 << 22):
+    # CRC32 des ``length`` premiers octets du fichier
+    checksum, remaining = 0, length
+    file.seek(0)
+    while remaining > 0:
+        block = file.read(min(block_size, remaining))
+        if not block:
+            break
+        checksum = zlib.crc32(block, checksum)
+        remaining -= len(block)
+    return checksum
+
+
+class IncrementalDataset:
+    """Jeu de données CSV suivi au fil des ajouts de lignes en fin de fichier.
+
+    Retient l'octet et le nombre de lignes déjà lus ainsi qu'un CRC32 de ce
+    préfixe, calculé à la lecture du CSV et conservé dans la copie Parquet :
+    un démarrage à froid sur une copie à jour ne relit pas le CSV. Quand le
+    fichier grandit sans que le préfixe ait changé, seule la fin est lue ;
+    les statistiques, les agrégats et la table d'évolution sont mis à jour à
+    partir des nouvelles lignes. Si le préfixe a changé (ou si le
+    fichier a rétréci, ou finissait par une ligne incomplète), tout est relu.
+
+    :meth:`refresh` renvoie une :data:`DatasetVersion` ; chaque mise à jour en
+    crée une nouvelle, les versions déjà renvoyées restent valides. Les lignes
+    sont gardées en colonnes Arrow (voir :mod:`core.registry`) : un ajout
+    ajoute un bloc aux colonnes existantes sans les recopier.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.version = None
+        self.offset = 0
+        self.checksum = 0
+        self.header = None
+        self.line_closed = True
+        self.rebuilds = 0
+        self.appends = 0
+
+    def refresh(self):
+        with self.lock:
+            stat = os.stat(self.path)
+            key = (self.path, stat.st_mtime_ns, stat.st_size)
+            if self.version is None or key != self.version.key:
+                if self.version is None or not self._append(stat):
+                    self._rebuild()
+            return self.version
+
+    def _rebuild(self):
+        while True:
+            stat = os.stat(self.path)
+            df, checksum = _read_dataset(self.path, stat)
+            frame = freeze(df)
+            with open(self.path, "rb") as file:
+                file.seek(max(stat.st_size - 1, 0))
+                last = file.read(1)
+            after = os.stat(self.path)
+            # Le fichier a changé pendant la lecture : on recommence
+            if (after.st_mtime_ns, after.st_size) == (stat.st_mtime_ns, stat.st_size):
+                break
+        self.header = pd.read_csv(self.path, nrows=0).columns.tolist()
+        self.offset, self.checksum = stat.st_size, checksum
+        self.line_closed = last in (b"", b"\n")
+        rollups = Rollups.from_frame(frame)
+        self.version = DatasetVersion(
+            (self.path, stat.st_mtime_ns, stat.st_size), frame, summarize(frame),
+            rollups, GrowthTable.from_rollups(rollups))
+        self.rebuilds += 1
+
+    def _append(self, stat):
+        if stat.st_size <= self.offset or not self.line_closed:
+            return False
+        if self.checksum is None:
+            # Copie Parquet écrite sans CRC : le préfixe ne peut pas être vérifié
+            return False
+        with open(self.path, "rb") as file:
+            if _checksum(file, self.offset) != self.checksum:
+                return False
+            tail = file.read(stat.st_size - self.offset)
+        try:
+            new = freeze(normalize(pd.read_csv(io.BytesIO(tail), header=None, names=self.header,
+                                               usecols=COLUMNS, dtype=DTYPES)).frame)
+        except (ValueError, pd.errors.ParserError):
+            return False
+        previous = self.version
+        frame = pd.concat([previous.frame, new], ignore_index=True)
+        rollups = previous.rollups.extended(new["Date"], new["Sales Revenue"])
+        self.version = DatasetVersion(
+            (self.path, stat.st_mtime_ns, stat.st_size), frame,
+            extend_summary(previous.stats, frame, len(previous.frame)),
+            rollups, GrowthTable.from_rollups(rollups))
+        self.offset += len(tail)
+        self.checksum = zlib.crc32(tail, self.checksum)
+        self.line_closed = tail.endswith(b"\n")
+        self.appends += 1
+        return True
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _incremental(path):
+    return IncrementalDataset(path)
+
+
+def load_incremental(path):
+    """Version à jour du jeu de données ``path`` et de ses statistiques, agrégats et évolution.
+
+    L'état est partagé entre les sessions : un ajout de lignes en fin de
+    fichier n'est lu et agrégé qu'une fois (voir :class:`IncrementalDataset`).
+    """
+    return _incremental(path).refresh()
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _range_index(key, _df):
+    return RangeStatsIndex.from_frame(_df)
+
+
+def load_range_index(path):
+    """Index de statistiques par intervalle de dates, construit une fois par version du fichier."""
+    version = load_incremental(path)
+    return _range_index(version.key, version.frame)
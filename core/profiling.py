@@ -0,0 +1,147 @@
+"""Mesure du temps passé dans chaque étape d'une exécution de page.
+
+Chaque page crée un :class:`RunProfiler`, entoure ses étapes de
+``with profiler.stage("nom"):`` puis appelle :meth:`RunProfiler.finish` :
+le détail s'affiche dans un panneau repliable de la barre latérale et une
+ligne JSON est ajoutée au journal (``logs/timings.jsonl`` par défaut, ou la
+variable d'environnement ``BI_TIMINGS_LOG``). Les exécutions interrompues
+par ``st.stop()`` ne sont pas journalisées.
+
+Percentiles par page et par étape à partir du journal :
+
+    python -m core.profiling logs/timings.jsonl
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+
+LOG_PATH = os.environ.get("BI_TIMINGS_LOG", os.path.join("logs", "timings.jsonl"))
+
+
+def figure_bytes(fig):
+    """Taille du JSON d'une figure Plotly, tel qu'envoyé au navigateur."""
+    return len(fig.to_json())
+
+
+def frame_bytes(df):
+    """Taille approximative d'un DataFrame envoyé à ``st.dataframe`` (données des colonnes)."""
+    return int(df.memory_usage(index=False).sum())
+
+
+def _run_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx()
+    except ImportError:
+        return None
+
+
+def _session_id():
+    ctx = _run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def fragment_rerun():
+    """Vrai si seuls des fragments (``@st.fragment``) sont réexécutés, pas toute la page."""
+    return bool(getattr(_run_ctx(), "fragment_ids_this_run", None))
+
+
+class RunProfiler:
+    """Temps, lignes traitées et octets envoyés pour chaque étape d'une exécution."""
+
+    def __init__(self, page, log_path=LOG_PATH):
+        self.page = page
+        self.log_path = log_path
+        self.stages = []
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Mesure le bloc ``with`` ; le dictionnaire renvoyé accepte ``rows`` et ``bytes``."""
+        record = {"stage": name, "rows": rows, "bytes": None}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 6)
+            self.stages.append(record)
+
+    @contextmanager
+    def fragment(self, name):
+        """Profileur à utiliser dans le fragment ``name``.
+
+        Lors d'une exécution complète, les étapes du fragment s'ajoutent à
+        celles de la page. Quand seul le fragment est réexécuté, elles sont
+        journalisées à part (page ``<page>:<name>``), sans panneau : un
+        fragment ne peut pas écrire dans la barre latérale.
+        """
+        if not fragment_rerun():
+            yield self
+            return
+        profiler = RunProfiler(f"{self.page}:{name}", self.log_path)
+        try:
+            yield profiler
+        finally:
+            profiler.finish(panel=False)
+
+    def record(self):
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "page": self.page,
+            "session": _session_id(),
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "stages": self.stages,
+        }
+
+    def finish(self, panel=True):
+        """Affiche le panneau de la barre latérale (si ``panel``) et ajoute l'exécution au journal."""
+        record = self.record()
+        if panel:
+            with st.sidebar.expander("Profilage de l'exécution"):
+                st.metric("Durée totale", f"{record['total_seconds'] * 1000:.0f} ms")
+                if self.stages:
+                    st.dataframe(
+                        pd.DataFrame(self.stages).assign(ms=lambda df: df["seconds"] * 1000)
+                        [["stage", "ms", "rows", "bytes"]]
+                        .rename(columns={"stage": "Étape", "rows": "Lignes", "bytes": "Octets envoyés"}),
+                        hide_index=True,
+                        use_container_width=True,
+                        column_config={"ms": st.column_config.NumberColumn("Durée (ms)", format="%.1f")})
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+        return record
+
+
+def read_log(path=LOG_PATH):
+    """Journal des exécutions, une ligne par (exécution, étape)."""
+    rows = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            rows.append({"page": record["page"], "stage": "(total)", "seconds": record["total_seconds"]})
+            rows.extend({"page": record["page"], **stage} for stage in record["stages"])
+    return pd.DataFrame(rows)
+
+
+def percentiles(log, quantiles=(0.5, 0.9, 0.99)):
+    """Percentiles des durées (en ms) par page et par étape."""
+    grouped = log.groupby(["page", "stage"])["seconds"]
+    table = grouped.quantile(list(quantiles)).unstack() * 1000
+    table.columns = [f"p{round(q * 100)} (ms)" for q in quantiles]
+    return table.assign(exécutions=grouped.size()).round(1)
+
+
+if __name__ == "__main__":
+    print(percentiles(read_log(sys.argv[1] if len(sys.argv) > 1 else LOG_PATH)).to_string())
@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+
+
+class RangeStatsIndex:
+    """Index précalculé pour les statistiques du CA sur un intervalle de dates.
+
+    Construit une seule fois par jeu de données, il répond aux requêtes
+    min / max (avec leur date), moyenne et médiane sur n'importe quel
+    intervalle sans reparcourir les lignes :
+
+    - dates triées + ``searchsorted`` pour trouver les bornes de l'intervalle ;
+    - sommes préfixes pour la moyenne ;
+    - sparse tables sur les min / max de blocs de ``BLOCK`` lignes (les bouts
+      de blocs en bord d'intervalle sont lus directement) ;
+    - wavelet matrix sur les rangs des valeurs pour la médiane et la valeur
+      la plus proche d'une cible (O(log n)), avec des bits compactés
+      (un bit par ligne et par niveau) pour rester en O(n) en mémoire.
+    """
+
+    BLOCK = 256
+
+    def __init__(self, dates, values):
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+        values = np.asarray(values, dtype="float64")
+
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        self.values = values[order]
+        n = len(self.values)
+
+        self.prefix = np.concatenate([[0.0], np.cumsum(self.values)])
+        self._min_table = self._block_table(np.inf, np.argmin, np.less_equal)
+        self._max_table = self._block_table(-np.inf, np.argmax, np.greater_equal)
+
+        # Rangs des valeurs (tri stable) : sorted_values[rank] = valeur
+        self.rank_order = np.argsort(self.values, kind="stable").astype(np.int64)
+        self.sorted_values = self.values[self.rank_order]
+        ranks = np.empty(n, dtype=np.int64)
+        ranks[self.rank_order] = np.arange(n)
+        self._build_wavelet(ranks)
+
+    @classmethod
+    def from_frame(cls, df, date_column="Date", value_column="Sales Revenue"):
+        return cls(df[date_column], df[value_column])
+
+    def __len__(self):
+        return len(self.values)
+
+    def label(self, position):
+        """Date de la ligne ``position``, au format AAAA-MM-JJ."""
+        return str(np.datetime_as_string(self.dates[position], unit="D"))
+
+    # --- Construction -----------------------------------------------------
+
+    def _block_table(self, fill, argbest, better):
+        # Position du meilleur élément de chaque bloc, puis sparse table sur les blocs :
+        # table[k][b] = position du meilleur élément des blocs b .. b + 2**k - 1
+        n, block = len(self.values), self.BLOCK
+        n_blocks = -(-n // block)
+        padded = np.full(n_blocks * block, fill)
+        padded[:n] = self.values
+        best = argbest(padded.reshape(n_blocks, block), axis=1) + np.arange(n_blocks) * block
+        table = [best]
+        k = 1
+        while (1 << k) <= n_blocks:
+            prev = table[-1]
+            half = 1 << (k - 1)
+            left, right = prev[:n_blocks - (1 << k) + 1], prev[half:half + n_blocks - (1 << k) + 1]
+            table.append(np.where(better(self.values[left], self.values[right]), left, right))
+            k += 1
+        return table
+
+    def _build_wavelet(self, ranks):
+        n = len(ranks)
+        self._levels = max(1, int(n - 1).bit_length())
+        self._words = []
+        self._counts = []
+        self._nzeros = []
+        current = ranks
+        n_words = -(-n // 64)
+        for level in range(self._levels - 1, -1, -1):
+            is_zero = ((current >> level) & 1) == 0
+            padded = np.zeros(n_words * 64, dtype=bool)
+            padded[:n] = is_zero
+            # words[j] : bits 64j .. 64j + 63 (1 = rang dont le bit du niveau vaut 0)
+            self._words.append(np.packbits(padded, bitorder="little").view("<u8"))
+            # counts[j] : nombre de zéros avant le mot j
+            self._counts.append(np.concatenate(
+                [[0], np.cumsum(padded.reshape(n_words, 64).sum(axis=1))]).astype(np.int64))
+            self._nzeros.append(int(is_zero.sum()))
+            current = np.concatenate([current[is_zero], current[~is_zero]])
+
+    def _rank0(self, depth, i):
+        # Nombre de zéros parmi les i premières positions du niveau ``depth``
+        # (entier Python : ``1 << bit`` déborderait en int64 NumPy pour bit = 63)
+        word, bit = int(i) >> 6, int(i) & 63
+        count = int(self._counts[depth][word])
+        if bit:
+            count += (int(self._words[depth][word]) & ((1 << bit) - 1)).bit_count()
+        return count
+
+    # --- Requêtes élémentaires --------------------------------------------
+
+    def bounds(self, start, end):
+        """Positions [lo, hi) des lignes dont la date est dans [start, end]."""
+        lo, hi = 0, len(self.values)
+        if start is not None:
+            lo = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), side="left")
+        if end is not None:
+            hi = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end)), side="right")
+        return int(lo), int(hi)
+
+    def _argbest(self, table, lo, hi, argbest, better):
+        # Candidats : bouts de blocs lus directement + sparse table sur les blocs entiers
+        block = self.BLOCK
+        first, last = -(-lo // block), hi // block
+        if first >= last:
+            return lo + int(argbest(self.values[lo:hi]))
+        candidates = []
+        if lo < first * block:
+            candidates.append(lo + int(argbest(self.values[lo:first * block])))
+        k = (last - first).bit_length() - 1
+        candidates += [int(table[k][first]), int(table[k][last - (1 << k)])]
+        if last * block < hi:
+            candidates.append(last * block + int(argbest(self.values[last * block:hi])))
+        best = candidates[0]
+        for position in candidates[1:]:
+            if self.values[position] == self.values[best]:
+                best = min(best, position)
+            elif better(self.values[position], self.values[best]):
+                best = position
+        return best
+
+    def kth_rank(self, lo, hi, k):
+        """Rang de la k-ième plus petite valeur (k à partir de 0) de [lo, hi)."""
+        rank = 0
+        for depth, level in enumerate(range(self._levels - 1, -1, -1)):
+            zlo, zhi = self._rank0(depth, lo), self._rank0(depth, hi)
+            if k < zhi - zlo:
+                lo, hi = zlo, zhi
+            else:
+                k -= zhi - zlo
+                rank |= 1 << level
+                offset = self._nzeros[depth]
+                lo, hi = offset + lo - zlo, offset + hi - zhi
+        return rank
+
+    def count_below(self, lo, hi, rank_limit):
+        """Nombre de lignes de [lo, hi) dont le rang est < ``rank_limit``."""
+        if rank_limit >= len(self.values):
+            return hi - lo
+        count = 0
+        for depth, level in enumerate(range(self._levels - 1, -1, -1)):
+            zlo, zhi = self._rank0(depth, lo), self._rank0(depth, hi)
+            if (rank_limit >> level) & 1:
+                count += zhi - zlo
+                offset = self._nzeros[depth]
+                lo, hi = offset + lo - zlo, offset + hi - zhi
+            else:
+                lo, hi = zlo, zhi
+        return count
+
+    def nearest(self, lo, hi, target):
+        """Position de la ligne de [lo, hi) dont la valeur est la plus proche de ``target``."""
+        below = self.count_below(lo, hi, int(np.searchsorted(self.sorted_values, target)))
+        candidates = []
+        if below > 0:
+            # Plus grande valeur < target : sa première occurrence dans l'intervalle
+            value = self.sorted_values[self.kth_rank(lo, hi, below - 1)]
+            first = self.count_below(lo, hi, int(np.searchsorted(self.sorted_values, value)))
+            candidates.append(int(self.rank_order[self.kth_rank(lo, hi, first)]))
+        if below < hi - lo:
+            candidates.append(int(self.rank_order[self.kth_rank(lo, hi, below)]))
+        return min(candidates, key=lambda pos: (abs(self.values[pos] - target), pos))
+
+    # --- Statistiques -----------------------------------------------------
+
+    def summary(self, start=None, end=None):
+        """Statistiques du CA entre ``start`` et ``end`` (bornes incluses).
+
+        Renvoie ``None`` si aucune ligne ne tombe dans l'intervalle.
+        """
+        lo, hi = self.bounds(start, end)
+        if hi <= lo:
+            return None
+        count = hi - lo
+        min_pos = self._argbest(self._min_table, lo, hi, np.argmin, np.less)
+        max_pos = self._argbest(self._max_table, lo, hi, np.argmax, np.greater)
+        mean = (self.prefix[hi] - self.prefix[lo]) / count
+        middle = [self.rank_order[self.kth_rank(lo, hi, k)]
+                  for k in sorted({(count - 1) // 2, count // 2})]
+        median = float(np.mean(self.values[middle]))
+        median_pos = self.nearest(lo, hi, median)
+        mean_pos = self.nearest(lo, hi, mean)
+        return {
+            "count": count,
+            "min": self.values[min_pos], "min_date": self.label(min_pos),
+            "max": self.values[max_pos], "max_date": self.label(max_pos),
+            "mean": mean, "mean_date": self.label(mean_pos),
+            "median": median, "median_date": self.label(median_pos),
+        }
@@ -0,0 +1,69 @@
+"""Jeux de données partagés en lecture seule entre toutes les sessions.
+
+``st.cache_data`` renvoie une copie (désérialisée) du DataFrame à chaque
+session : la mémoire croît avec le nombre d'utilisateurs. Ici, chaque jeu de
+données est construit une fois par processus (``st.cache_resource``) puis
+converti en colonnes Arrow, dont les tampons sont immuables ; les tableaux
+NumPy qui en sont tirés (``to_numpy()``) sont des vues en lecture seule.
+
+Chaque session reçoit une vue (copie superficielle) du frame partagé : avec
+le copy-on-write de pandas, une colonne ajoutée ou remplacée dans la vue
+n'existe que pour cette session, sans copier ni modifier les colonnes
+partagées.
+
+Les jeux propres à une session (données régénérées avec une autre graine...)
+ne doivent pas entrer dans ces caches, qui vivent aussi longtemps que le
+processus : :func:`session_resource` les garde dans la session.
+"""
+import pandas as pd
+import streamlit as st
+
+
+def _arrow_dtype(arrow_type):
+    import pyarrow as pa
+
+    # Les colonnes catégorielles restent des ``Categorical`` pandas (codes + catégories)
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+
+def freeze(df):
+    """Copie de ``df`` en colonnes Arrow (tampons immuables, index par défaut)."""
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(df, preserve_index=False).to_pandas(types_mapper=_arrow_dtype)
+
+
+def view(df):
+    """Vue de ``df`` propre à l'appelant : les modifications n'atteignent pas ``df``."""
+    return df.copy(deep=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _shared(key, _build):
+    return freeze(_build())
+
+
+def shared_frame(key, build):
+    """Vue du frame partagé identifié par ``key``, construit une fois par processus avec ``build()``.
+
+    ``key`` doit changer avec le contenu (chemin et version du fichier,
+    paramètres de génération...) : deux sessions qui demandent la même clé
+    lisent les mêmes colonnes en mémoire.
+    """
+    return view(_shared(key, build))
+
+
+def session_resource(scope, name, build):
+    """Ressource ``name`` du jeu ``scope``, construite avec ``build()`` et gardée dans la session seulement.
+
+    Rien n'est gardé au niveau du processus : les ressources disparaissent
+    avec la session, et celles d'un jeu précédent sont libérées dès que la
+    session passe à un autre ``scope``.
+    """
+    scoped = st.session_state.get("session_resources")
+    if scoped is None or scoped[0] != scope:
+        scoped = st.session_state["session_resources"] = (scope, {})
+    resources = scoped[1]
+    if name not in resources:
+        resources[name] = build()
+    return resources[name]
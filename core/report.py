@@ -0,0 +1,209 @@
+"""Rapports Excel par lot, sans passer par l'interface.
+
+Pour chaque fichier de ventes (CSV ou XLSX avec les colonnes Date et Sales
+Revenue) d'un dossier, calcule les statistiques du CA, l'évolution sur une
+fenêtre de mois et la croissance d'une année sur l'autre, puis écrit un
+classeur ``<fichier>.xlsx`` :
+
+- Statistiques : min, max, moyenne, médiane et leurs dates ;
+- Données : les lignes du fichier et leur courbe (comme la page demo) ;
+- Évolution : l'évolution du CA sur la fenêtre choisie ;
+- Années : CA annuel, taux de croissance et catégorie (comme la page year).
+
+Les fichiers sont répartis sur un pool de processus ; une synthèse (une ligne
+par fichier) est écrite dans ``synthese.csv``.
+
+Usage (depuis la racine du dépôt) :
+
+    python -m core.report ventes/ --out rapports/ --workers 4 --window 3
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from core.classification import batch_growth
+from core.export import EXCEL_MAX_ROWS, workbook_bytes
+from core.growth import GrowthTable
+from core.ingest import read_upload
+from core.rollups import Rollups
+from core.stats import summarize
+
+EXTENSIONS = (".csv", ".xlsx")
+# Seuils par défaut de la page year.py :
+# (croissance_elevee, croissance_moderee, declin_faible, declin_modere)
+THRESHOLDS = (20, 5, -5, -20)
+# Catégorie des années que les données ne couvrent pas entièrement
+PARTIAL_YEAR = "Année incomplète"
+
+
+def statistics_frame(stats):
+    """Statistiques de :func:`core.stats.summarize` sous forme de tableau Indicateur / Valeur / Date."""
+    labels = {"min": "Minimum", "max": "Maximum", "mean": "Moyenne", "median": "Médiane"}
+    return pd.DataFrame({
+        "Indicateur": list(labels.values()),
+        "Valeur": [float(stats[key]) for key in labels],
+        "Date": [stats[f"{key}_date"] for key in labels],
+    })
+
+
+def covered_years(first, last):
+    """Années couvertes de janvier à décembre (au mois près) par des données allant de ``first`` à ``last``.
+
+    Seules la première et la dernière année peuvent être incomplètes : une
+    série qui commence en mars ou s'arrête en janvier n'a pas un CA annuel
+    comparable à celui des autres années.
+    """
+    if first is None or last is None:
+        return set()
+    return {year for year in range(first.year, last.year + 1)
+            if (year > first.year or first.month == 1) and (year < last.year or last.month == 12)}
+
+
+def complete_years(rollups):
+    """Comme :func:`covered_years`, pour le premier et le dernier mois avec des ventes de ``rollups``."""
+    months = rollups.level("Mois")
+    months = months.index[months["count"] > 0]
+    if months.empty:
+        return set()
+    return covered_years(months[0], months[-1])
+
+
+def year_frame(rollups, name, thresholds):
+    """CA annuel, avec la croissance et la catégorie par rapport à l'année précédente.
+
+    Les années incomplètes (voir :func:`complete_years`) gardent leur CA mais
+    ne sont ni comparées ni classées : leur catégorie l'indique.
+    """
+    totals = rollups.year_totals()
+    complete = totals.index.isin(sorted(complete_years(rollups)))
+    years = pd.DataFrame({"Année": totals.index, "Chiffre d'affaires": totals.to_numpy(),
+                          "Année complète": complete})
+    compared = totals[complete]
+    if len(compared) < 2:
+        years = years.assign(**{"Croissance (%)": float("nan"), "Catégorie": ""})
+    else:
+        table = pd.DataFrame([compared.to_numpy()], columns=[str(year) for year in compared.index])
+        growth = batch_growth(table.assign(Fichier=name), "Fichier", thresholds)
+        years = years.merge(growth[["Année", "Croissance (%)", "Catégorie"]], on="Année", how="left")
+        years["Catégorie"] = years["Catégorie"].astype(object).fillna("")
+    years.loc[~complete, "Catégorie"] = PARTIAL_YEAR
+    return years
+
+
+def build_report(path, out_dir, window=3, thresholds=THRESHOLDS):
+    """Écrit le classeur de ``path`` dans ``out_dir`` et renvoie sa ligne de synthèse."""
+    start = time.perf_counter()
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, "rb") as file:
+        df, rejected = read_upload(file)
+    stats = summarize(df)
+    if stats is None:
+        raise ValueError("aucune ligne de données")
+    rollups = Rollups.from_frame(df)
+    growth = GrowthTable.from_rollups(rollups).window(window)
+    years = year_frame(rollups, name, thresholds)
+
+    sheets = [(statistics_frame(stats), "Statistiques", None, None)]
+    if len(df) < EXCEL_MAX_ROWS:
+        sheets.append((df, "Données", "CA", "line"))
+    sheets += [
+        (growth[["Date", "Évolution", "Croissance (%)"]], "Évolution", "Évolution du CA", "column"),
+        (years, "Années", None, "column"),
+    ]
+    with open(os.path.join(out_dir, f"{name}.xlsx"), "wb") as file:
+        file.write(workbook_bytes(sheets))
+
+    # Dernière année complète (la dernière année tout court si aucune ne l'est)
+    last = years[years["Année complète"]].iloc[-1] if years["Année complète"].any() else years.iloc[-1]
+    return {
+        "Fichier": os.path.basename(path),
+        "Lignes": len(df),
+        "Lignes rejetées": len(rejected),
+        "Minimum": float(stats["min"]), "Date du minimum": stats["min_date"],
+        "Maximum": float(stats["max"]), "Date du maximum": stats["max_date"],
+        "Moyenne": float(stats["mean"]),
+        "Médiane": float(stats["median"]),
+        "Dernière année": int(last["Année"]),
+        "Croissance (%)": float(last["Croissance (%)"]),
+        "Catégorie": str(last["Catégorie"]),
+        "Durée (s)": round(time.perf_counter() - start, 3),
+        "Erreur": "",
+    }
+
+
+def _run_one(path, out_dir, window, thresholds):
+    # Toute erreur reste limitée à son fichier : elle est reportée dans la synthèse
+    # au lieu d'interrompre le lot (et de remonter par ``future.result()``)
+    try:
+        return build_report(path, out_dir, window, thresholds)
+    except Exception as error:
+        return {"Fichier": os.path.basename(path), "Erreur": str(error) or type(error).__name__}
+
+
+def sales_files(directory):
+    """Fichiers CSV / XLSX du dossier, triés par nom."""
+    return sorted(
+        os.path.join(directory, entry) for entry in os.listdir(directory)
+        if entry.lower().endswith(EXTENSIONS) and os.path.isfile(os.path.join(directory, entry)))
+
+
+def run(paths, out_dir, window=3, thresholds=THRESHOLDS, workers=None, log=print):
+    """Construit les rapports de ``paths`` sur ``workers`` processus ; renvoie la synthèse."""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    rows = []
+
+    def done(row):
+        rows.append(row)
+        status = row["Erreur"] or f"{row['Lignes']:,} lignes en {row['Durée (s)']:.2f} s"
+        log(f"[{len(rows)}/{len(paths)}] {row['Fichier']} : {status}")
+
+    if workers == 1:
+        for path in paths:
+            done(_run_one(path, out_dir, window, thresholds))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_one, path, out_dir, window, thresholds) for path in paths]
+            for future in as_completed(futures):
+                done(future.result())
+
+    elapsed = time.perf_counter() - start
+    summary = pd.DataFrame(rows).sort_values("Fichier", ignore_index=True)
+    if "Lignes" in summary:
+        # Entiers nullables : les fichiers en erreur n'ont ni lignes ni année
+        summary = summary.astype({"Lignes": "Int64", "Lignes rejetées": "Int64", "Dernière année": "Int64"})
+    total_rows = int(summary["Lignes"].sum()) if "Lignes" in summary else 0
+    log(f"{len(paths)} fichiers, {total_rows:,} lignes en {elapsed:.2f} s "
+        f"({len(paths) / elapsed:.1f} fichiers/s, {total_rows / elapsed:,.0f} lignes/s, "
+        f"{workers} processus)")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="dossier des fichiers de ventes (CSV / XLSX)")
+    parser.add_argument("--out", default="rapports", help="dossier des classeurs générés")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="nombre de processus (par défaut : nombre de cœurs)")
+    parser.add_argument("--window", type=int, default=3, help="fenêtre d'évolution, en mois")
+    parser.add_argument("--thresholds", nargs=4, type=float, default=THRESHOLDS,
+                        metavar=("ELEVEE", "MODEREE", "DECLIN_FAIBLE", "DECLIN_MODERE"),
+                        help="seuils des catégories de croissance (%%)")
+    args = parser.parse_args(argv)
+
+    paths = sales_files(args.directory)
+    if not paths:
+        print(f"Aucun fichier CSV ou XLSX dans {args.directory}")
+        return 1
+    summary = run(paths, args.out, args.window, tuple(args.thresholds), args.workers)
+    summary.to_csv(os.path.join(args.out, "synthese.csv"), index=False)
+    return 1 if summary["Erreur"].astype(bool).any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
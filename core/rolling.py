@@ -0,0 +1,221 @@
+"""Statistiques glissantes du CA sur une fenêtre calendaire.
+
+Moyenne, médiane, min et max du CA journalier sur les ``window`` derniers
+jours (fenêtre ]t - window, t], les jours sans donnée ne comptent pas), et
+croissance du total de la fenêtre par rapport à la même fenêtre un an plus
+tôt. Chaque statistique est mise à jour en temps constant ou logarithmique
+quand la fenêtre avance d'un point, au lieu d'être recalculée sur toute la
+fenêtre comme avec ``rolling().apply`` :
+
+- somme et nombre courants (ajout du point entrant, retrait des sortants) ;
+- files monotones (``deque``) pour le min et le max : chaque point y entre
+  et en sort au plus une fois, O(1) amorti ;
+- deux tas (moitié basse, moitié haute de la fenêtre) pour la médiane, les
+  points sortis n'étant retirés qu'en arrivant au sommet d'un tas :
+  O(log w) amorti par point.
+
+Une série de n points est donc traitée en O(n log w) (w : nombre de points
+dans la fenêtre).
+
+:class:`RollingStats` consomme la série par blocs et garde son état entre
+deux blocs : une série qui s'allonge (voir :mod:`core.loader`) n'est pas
+recalculée depuis le début. Les pages lui passent le CA total par jour
+(:meth:`core.rollups.Rollups.day_totals`), dont la longueur dépend de la
+période couverte et non du nombre de lignes.
+"""
+import heapq
+from collections import Counter, deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+COLUMNS = ["Date", "Moyenne", "Médiane", "Minimum", "Maximum", "Jours"]
+# Fenêtre proposée par défaut (jours), préchauffée au démarrage (voir core.warmup)
+DEFAULT_WINDOW = 30
+
+
+class WindowMedian:
+    """Médiane d'un ensemble de valeurs qui évolue par ajouts et retraits.
+
+    ``low`` (tas max, valeurs opposées) contient la moitié basse, ``high``
+    (tas min) la moitié haute ; ``low`` a autant ou un élément de plus que
+    ``high``. Un retrait est différé (compté dans ``pending``) jusqu'à ce
+    que la valeur atteigne le sommet de son tas ; les tas sont reconstruits
+    quand les valeurs différées y deviennent majoritaires, ce qui borne leur
+    taille à O(w).
+    """
+
+    def __init__(self):
+        self.low = []
+        self.high = []
+        self.pending = Counter()
+        self.low_size = self.high_size = 0
+
+    def __len__(self):
+        return self.low_size + self.high_size
+
+    def _prune(self, heap, sign):
+        # Retire du sommet les valeurs dont le retrait a été différé
+        while heap and self.pending[sign * heap[0]]:
+            value = sign * heapq.heappop(heap)
+            self.pending[value] -= 1
+            if not self.pending[value]:
+                del self.pending[value]
+
+    def _balance(self):
+        if self.low_size > self.high_size + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+            self.low_size, self.high_size = self.low_size - 1, self.high_size + 1
+            self._prune(self.low, -1)
+        elif self.low_size < self.high_size:
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+            self.low_size, self.high_size = self.low_size + 1, self.high_size - 1
+            self._prune(self.high, 1)
+
+    def add(self, value):
+        if not self.low_size or value <= -self.low[0]:
+            heapq.heappush(self.low, -value)
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, value)
+            self.high_size += 1
+        self._balance()
+
+    def remove(self, value):
+        """Retire une occurrence de ``value`` (qui doit être présente)."""
+        self.pending[value] += 1
+        if value <= -self.low[0]:
+            self.low_size -= 1
+            self._prune(self.low, -1)
+        else:
+            self.high_size -= 1
+            self._prune(self.high, 1)
+        self._balance()
+        if len(self.low) + len(self.high) > 2 * len(self) + 32:
+            self._rebuild()
+
+    def _rebuild(self):
+        # Tas reconstruits à partir des seules valeurs présentes
+        low = [negated for negated in self.low if not self._take(-negated)]
+        high = [value for value in self.high if not self._take(value)]
+        heapq.heapify(low)
+        heapq.heapify(high)
+        self.low, self.high = low, high
+        self.pending.clear()
+
+    def _take(self, value):
+        # Vrai si ``value`` est une occurrence retirée (et la décompte)
+        if self.pending[value]:
+            self.pending[value] -= 1
+            return True
+        return False
+
+    def median(self):
+        if self.low_size > self.high_size:
+            return -self.low[0]
+        return (-self.low[0] + self.high[0]) / 2
+
+
+class RollingStats:
+    """Moyenne, médiane, min et max glissants sur ``window`` jours, calculés au fil de l'eau."""
+
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("La fenêtre doit compter au moins un jour.")
+        self.window = np.timedelta64(int(window), "D")
+        self.points = deque()
+        self.lows = deque()
+        self.highs = deque()
+        self.median = WindowMedian()
+        self.total = 0.0
+        self.last = None
+
+    def _evict(self, date):
+        # Retire les points sortis de la fenêtre ]date - window, date]
+        start = date - self.window
+        while self.points and self.points[0][0] <= start:
+            old, value = self.points.popleft()
+            self.total -= value
+            self.median.remove(value)
+            if self.lows[0][0] == old:
+                self.lows.popleft()
+            if self.highs[0][0] == old:
+                self.highs.popleft()
+
+    def _push(self, date, value):
+        self.points.append((date, value))
+        self.total += value
+        self.median.add(value)
+        while self.lows and self.lows[-1][1] >= value:
+            self.lows.pop()
+        self.lows.append((date, value))
+        while self.highs and self.highs[-1][1] <= value:
+            self.highs.pop()
+        self.highs.append((date, value))
+
+    def update(self, dates, values):
+        """Ajoute un bloc de points (dates croissantes, postérieures au bloc précédent).
+
+        Renvoie un DataFrame (Date, Moyenne, Médiane, Minimum, Maximum,
+        Jours) avec une ligne par point du bloc. Les valeurs manquantes sont
+        ignorées.
+        """
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        values = np.asarray(values, dtype="float64")
+        keep = ~np.isnan(values)
+        dates, values = dates[keep], values[keep]
+        if len(dates) and ((self.last is not None and dates[0] <= self.last) or (np.diff(dates) <= 0).any()):
+            raise ValueError("Les dates doivent être strictement croissantes (un point par jour).")
+        out = np.empty((len(dates), 5))
+        for row, (date, value) in enumerate(zip(dates, values.tolist())):
+            self._evict(date)
+            self._push(date, value)
+            count = len(self.points)
+            out[row] = (self.total / count, self.median.median(), self.lows[0][1], self.highs[0][1], count)
+        if len(dates):
+            self.last = dates[-1]
+        frame = pd.DataFrame(out[:, :4], columns=COLUMNS[1:5])
+        frame.insert(0, "Date", dates.astype("datetime64[ns]"))
+        frame["Jours"] = out[:, 4].astype("int64")
+        return frame
+
+
+def year_over_year(rolling):
+    """Croissance (%) du total de chaque fenêtre par rapport à la fenêtre finissant un an plus tôt.
+
+    ``rolling`` est le résultat de :meth:`RollingStats.update` ; la fenêtre
+    de comparaison est la dernière qui se termine au plus tard à la même date
+    de l'année précédente. NaN quand elle n'existe pas ou que son total est nul.
+    """
+    dates = rolling["Date"].to_numpy(dtype="datetime64[ns]")
+    totals = (rolling["Moyenne"] * rolling["Jours"]).to_numpy()
+    previous_dates = (pd.DatetimeIndex(dates) - pd.DateOffset(years=1)).to_numpy()
+    positions = np.searchsorted(dates, previous_dates, side="right") - 1
+    previous = np.where(positions >= 0, totals[np.maximum(positions, 0)], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(previous != 0, (totals - previous) / previous * 100, np.nan)
+
+
+def rolling_frame(days, window, chunk_size=100_000):
+    """Statistiques glissantes et croissance annuelle de ``days`` (CA par jour, index de dates)."""
+    stats = RollingStats(window)
+    dates, values = days.index.to_numpy(), days.to_numpy(dtype="float64")
+    chunks = [stats.update(dates[start:start + chunk_size], values[start:start + chunk_size])
+              for start in range(0, len(days), chunk_size)]
+    frame = pd.concat(chunks, ignore_index=True) if chunks else stats.update([], [])
+    frame["Croissance annuelle (%)"] = year_over_year(frame)
+    return frame
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def rolling_table(key, window, _days):
+    """Statistiques glissantes de ``_days``, calculées une fois par (``key``, ``window``).
+
+    ``_days`` peut être une fonction sans argument qui renvoie le CA par jour :
+    il n'est alors calculé (requête SQL pour un jeu de l'entrepôt) qu'en cas
+    d'absence dans le cache.
+    """
+    if callable(_days):
+        _days = _days()
+    return rolling_frame(_days, window)
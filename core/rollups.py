@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.charts import MAX_POINTS
+
+# Granularités, de la plus fine à la plus grossière :
+# (règle de rééchantillonnage pandas, niveau dont elle est dérivée)
+LEVELS = {
+    "Jour": ("D", None),
+    "Semaine": ("W-MON", "Jour"),
+    "Mois": ("MS", "Jour"),
+    "Trimestre": ("QS", "Mois"),
+    "Année": ("YS", "Trimestre"),
+}
+
+
+class Rollups:
+    """Agrégats du CA (somme, moyenne, min, max, nombre de lignes) par jour,
+    semaine, mois, trimestre et année.
+
+    Les lignes brutes ne sont parcourues qu'une fois, pour le niveau jour ;
+    chaque niveau plus grossier est dérivé d'un niveau plus fin (somme des
+    sommes, min des min...), beaucoup plus petit. Les périodes sans donnée sont
+    conservées (nombre = 0, autres valeurs NaN) pour que les séries restent
+    régulières.
+    """
+
+    def __init__(self, dates, values):
+        self._derive(self._daily(dates, values))
+
+    @staticmethod
+    def _daily(dates, values):
+        series = pd.Series(np.asarray(values, dtype="float64"),
+                           index=pd.to_datetime(pd.Series(dates)).to_numpy()).sort_index()
+        daily = series.resample("D")
+        return pd.DataFrame({
+            "sum": daily.sum(min_count=1),
+            "min": daily.min(),
+            "max": daily.max(),
+            "count": daily.count(),
+        })
+
+    def _derive(self, day):
+        # Chaque niveau plus grossier est dérivé d'un niveau plus fin
+        aggregates = {"Jour": day}
+        for name, (rule, parent) in LEVELS.items():
+            if parent is not None:
+                grouped = aggregates[parent].resample(rule, label="left", closed="left")
+                aggregates[name] = pd.DataFrame({
+                    "sum": grouped["sum"].sum(min_count=1),
+                    "min": grouped["min"].min(),
+                    "max": grouped["max"].max(),
+                    "count": grouped["count"].sum(),
+                })
+        self.levels = {}
+        for name, level in aggregates.items():
+            level = level.assign(mean=level["sum"] / level["count"].where(level["count"] > 0))
+            # Seule la somme garde la double précision : elle s'accumule sur des années
+            self.levels[name] = level.astype(
+                {"min": "float32", "max": "float32", "mean": "float32", "count": "int32"})
+
+    def extended(self, dates, values):
+        """Agrégats après ajout de lignes, sans reparcourir les lignes déjà agrégées.
+
+        Seules les nouvelles lignes sont ramenées au jour ; elles sont fusionnées
+        avec le niveau jour existant (somme des sommes, min des min...), puis les
+        niveaux plus grossiers sont redérivés à partir des jours.
+        """
+        new = self._daily(dates, values)
+        old = self.levels["Jour"][["sum", "min", "max", "count"]]
+        if new.empty:
+            return self
+        if not old.empty:
+            index = pd.date_range(min(old.index[0], new.index[0]),
+                                  max(old.index[-1], new.index[-1]), freq="D")
+            old, new = old.reindex(index), new.reindex(index)
+            new = pd.DataFrame({
+                "sum": old["sum"].add(new["sum"], fill_value=0),
+                "min": np.fmin(old["min"], new["min"]),
+                "max": np.fmax(old["max"], new["max"]),
+                "count": old["count"].fillna(0) + new["count"].fillna(0),
+            }, index=index)
+        rollups = Rollups.__new__(Rollups)
+        rollups._derive(new)
+        return rollups
+
+    @classmethod
+    def from_frame(cls, df, date_column="Date", value_column="Sales Revenue"):
+        return cls(df[date_column], df[value_column])
+
+    def level(self, name, start=None, end=None):
+        """Agrégats du niveau ``name`` pour les périodes commençant entre ``start`` et ``end``."""
+        level = self.levels[name]
+        if start is not None or end is not None:
+            level = level.loc[pd.Timestamp(start) if start is not None else None:
+                              pd.Timestamp(end) if end is not None else None]
+        return level
+
+    def chart_level(self, start=None, end=None, max_points=MAX_POINTS):
+        """Niveau le plus fin dont le nombre de périodes non vides tient dans ``max_points``."""
+        for name in LEVELS:
+            if (self.level(name, start, end)["count"] > 0).sum() <= max_points:
+                return name
+        return "Année"
+
+    def chart_frame(self, start=None, end=None, max_points=MAX_POINTS):
+        """CA total par période au niveau :func:`chart_level`, au format des pages (Date, Sales Revenue)."""
+        name = self.chart_level(start, end, max_points)
+        level = self.level(name, start, end)
+        level = level[level["count"] > 0]
+        return name, pd.DataFrame({
+            "Date": level.index.strftime("%Y-%m-%d"),
+            "Sales Revenue": level["sum"].to_numpy(),
+        })
+
+    def day_totals(self):
+        """CA total par jour (jours sans donnée exclus), indexé par date."""
+        days = self.levels["Jour"]
+        return days.loc[days["count"] > 0, "sum"]
+
+    def year_totals(self):
+        """CA total par année (années sans donnée exclues)."""
+        years = self.levels["Année"]
+        years = years[years["count"] > 0]
+        return pd.Series(years["sum"].to_numpy(), index=years.index.year, name="Chiffre d'affaires")
+
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def rollup_pyramid(key, _df):
+    """Agrégats de ``_df``, calculés une fois par ``key`` (identifiant du jeu de données)."""
+    return Rollups.from_frame(_df)
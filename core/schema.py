@@ -0,0 +1,153 @@
+"""Schéma typé des jeux de données, appliqué par tous les points d'entrée.
+
+Fichier CSV de la page demo, imports de la page times_series, données
+générées, entrepôt et rapports passent par :func:`normalize` :
+
+- ``Date`` est convertie une fois en ``datetime64`` (8 octets par ligne, au
+  lieu d'une chaîne Python) ; les filtres de période deviennent des
+  recherches dichotomiques sur des entiers ;
+- ``Sales Revenue`` reste en ``float64`` par défaut, ou peut être réduit en
+  ``float32`` ou en centimes entiers (``int64``) ;
+- les autres colonnes textuelles (magasin, région...) deviennent des
+  catégories ;
+- les lignes invalides (date illisible, CA non numérique ou manquant) sont
+  repérées en une seule opération vectorisée, puis écartées ou signalées.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Colonnes utilisées par les pages
+COLUMNS = ["Date", "Sales Revenue"]
+# Types de lecture (avant normalisation) : les dates sont parsées par normalize()
+DTYPES = {"Date": "string", "Sales Revenue": "float64"}
+DATE_DTYPE = "datetime64[ns]"
+# Colonne de l'entité (magasin...) d'un jeu fusionné fichier par fichier (voir core.ingest.merge_frames)
+ENTITY = "Fichier"
+# Formats de date acceptés, par ordre de préférence (un seul par colonne, voir parse_dates) :
+# ISO 8601, puis jour en premier (usage français), puis mois en premier
+DATE_FORMATS = ["ISO8601", "%d/%m/%Y", "%d/%m/%Y %H:%M", "%d/%m/%Y %H:%M:%S", "%d-%m-%Y", "%d.%m.%Y",
+                "%d/%m/%y", "%m/%d/%Y"]
+REVENUE_DTYPES = {"float64": "float64", "float32": "float32", "cents": "int64"}
+
+# Lignes invalides montrées dans les messages d'erreur
+SAMPLE_ROWS = 5
+
+# Jeu de données normalisé et lignes écartées (avec leur numéro de ligne d'origine)
+Normalized = namedtuple("Normalized", ["frame", "rejected"])
+
+
+def _text(dates):
+    # Dates écrites en texte (les cellules Excel peuvent déjà être des dates), sans doublons
+    if isinstance(dates.dtype, pd.StringDtype):
+        text = dates.dropna()
+    else:
+        text = dates[[isinstance(value, str) for value in dates]]
+    return pd.Series(text.unique(), dtype=object)
+
+
+def detect_date_format(dates, formats=DATE_FORMATS):
+    """Format de ``formats`` retenu pour toute la colonne ``dates``.
+
+    Le premier format qui lit toutes les dates écrites en texte est retenu ;
+    si aucun ne les lit toutes, celui qui en lit le plus. Renvoie ``None``
+    si la colonne ne contient aucun texte.
+    """
+    text = _text(dates)
+    if text.empty:
+        return None
+    best, best_count = formats[0], -1
+    for date_format in formats:
+        count = pd.to_datetime(text, format=date_format, errors="coerce", utc=True).notna().sum()
+        if count == len(text):
+            return date_format
+        if count > best_count:
+            best, best_count = date_format, count
+    return best
+
+
+def _naive(dates):
+    # Dates avec fuseau (2024-01-01T10:00:00Z, +02:00...) ramenées en heure UTC sans fuseau
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_convert(None)
+    return dates.astype(DATE_DTYPE)
+
+
+def _to_datetime(dates, date_format):
+    # utc=True : une colonne qui mêle plusieurs décalages horaires reste lisible
+    return _naive(pd.to_datetime(dates, format=date_format, errors="coerce", utc=True))
+
+
+def parse_dates(dates, date_format=None):
+    """Dates en ``datetime64`` ; les valeurs illisibles deviennent ``NaT``.
+
+    Toute la colonne est lue avec un seul format, ``date_format`` ou celui
+    de :func:`detect_date_format` : une date ambiguë (01/02/2024) n'est
+    jamais lue différemment de ses voisines, et une date qui ne suit pas le
+    format de la colonne est écartée plutôt que devinée. Les dates qui
+    portent un fuseau horaire sont converties en heure UTC.
+    """
+    if pd.api.types.is_datetime64_any_dtype(dates.dtype):
+        return _naive(dates)
+    if date_format is None:
+        # Format ISO d'abord (chemin rapide : une seule lecture si toutes les dates le suivent)
+        parsed = _to_datetime(dates, DATE_FORMATS[0])
+        if not (parsed.isna() & dates.notna()).any():
+            return parsed
+        date_format = detect_date_format(dates)
+    return _to_datetime(dates, date_format or DATE_FORMATS[0])
+
+
+def _revenue(values, revenue):
+    values = values.astype("float64")
+    if revenue == "cents":
+        return np.round(values * 100).astype("int64")
+    return values.astype(REVENUE_DTYPES[revenue])
+
+
+def invalid_rows_error(rows):
+    """``ValueError`` qui donne le nombre et les premiers numéros des lignes ``rows`` (positions)."""
+    return ValueError(
+        f"{len(rows):,} lignes invalides (date ou CA illisible), "
+        f"par exemple les lignes {', '.join(str(row + 1) for row in rows[:SAMPLE_ROWS])}")
+
+
+def normalize(df, revenue="float64", errors="drop", date_format=None):
+    """Jeu de données ``df`` au schéma des pages ; renvoie un :data:`Normalized`.
+
+    ``revenue`` vaut ``"float64"``, ``"float32"`` ou ``"cents"`` (montants en
+    centimes entiers). Les dates sont lues avec ``date_format`` (détecté par
+    défaut, voir :func:`parse_dates`). Les lignes dont la date ou le CA est
+    invalide sont écartées (``errors="drop"``) ou font lever une
+    ``ValueError`` qui en donne le nombre et les premiers numéros
+    (``errors="raise"``).
+    """
+    if revenue not in REVENUE_DTYPES:
+        raise ValueError(f"Type de CA inconnu : {revenue!r} (attendu : {', '.join(REVENUE_DTYPES)})")
+    missing = [column for column in COLUMNS if column not in df]
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+    dates = parse_dates(df["Date"], date_format)
+    values = pd.to_numeric(df["Sales Revenue"], errors="coerce")
+    invalid = (dates.isna() | values.isna()).to_numpy()
+
+    if invalid.any() and errors == "raise":
+        raise invalid_rows_error(np.flatnonzero(invalid))
+
+    columns = {}
+    for column in df.columns:
+        if column == "Date":
+            columns[column] = dates
+        elif column == "Sales Revenue":
+            columns[column] = values
+        elif isinstance(df[column].dtype, pd.CategoricalDtype) or pd.api.types.is_numeric_dtype(df[column].dtype):
+            columns[column] = df[column]
+        else:
+            columns[column] = df[column].astype("category")
+    frame = pd.DataFrame(columns)
+    rejected = df.iloc[np.flatnonzero(invalid)]
+    if invalid.any():
+        frame = frame[~invalid].reset_index(drop=True)
+    frame["Sales Revenue"] = _revenue(frame["Sales Revenue"], revenue)
+    return Normalized(frame, rejected)
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+
+def _label(dates, position):
+    # Date de la ligne ``position``, au format AAAA-MM-JJ (comme core.range_index et core.store)
+    date = dates.iloc[position]
+    return pd.Timestamp(date).strftime("%Y-%m-%d") if isinstance(date, (pd.Timestamp, np.datetime64)) else date
+
+
+def summarize(df, date_column="Date", value_column="Sales Revenue"):
+    """Statistiques du CA (min, max, moyenne, médiane et leurs dates) en NumPy.
+
+    Remplace les réductions pandas indépendantes des pages : chaque statistique
+    est calculée directement sur le tableau des valeurs, la médiane par
+    ``np.partition`` (sélection en O(n)) plutôt que par un tri complet, et les
+    lignes les plus proches de la moyenne et de la médiane sont trouvées en un
+    seul balayage. Renvoie ``None`` si le tableau est vide.
+    """
+    values = df[value_column].to_numpy(dtype="float64")
+    dates = df[date_column]
+    count = len(values)
+    if count == 0:
+        return None
+    min_pos = int(values.argmin())
+    max_pos = int(values.argmax())
+    mean = values.sum() / count
+    return {
+        "count": count,
+        "min": values[min_pos], "min_date": _label(dates, min_pos),
+        "max": values[max_pos], "max_date": _label(dates, max_pos),
+        **_center(values, dates, mean),
+    }
+
+
+def _center(values, dates, mean):
+    # Médiane par sélection, puis lignes les plus proches de la moyenne et de la médiane
+    count = len(values)
+    middle = sorted({(count - 1) // 2, count // 2})
+    median = float(np.partition(values, middle)[middle].mean())
+    targets = np.array([mean, median])
+    mean_pos, median_pos = np.abs(values[:, None] - targets).argmin(axis=0)
+    return {
+        "mean": mean, "mean_date": _label(dates, mean_pos),
+        "median": median, "median_date": _label(dates, median_pos),
+    }
+
+
+def extend_summary(stats, df, start, date_column="Date", value_column="Sales Revenue"):
+    """Statistiques de ``df`` à partir de ``stats``, celles de ses ``start`` premières lignes.
+
+    Min, max et moyenne ne lisent que les lignes ajoutées ; la médiane et les
+    dates de la moyenne et de la médiane demandent encore un passage NumPy sur
+    tout le tableau (en mémoire, sans relire le fichier).
+    """
+    if stats is None:
+        return summarize(df, date_column, value_column)
+    values = df[value_column].to_numpy(dtype="float64")
+    dates = df[date_column]
+    tail = values[start:]
+    if len(tail) == 0:
+        return stats
+    stats = dict(stats)
+    # À égalité, la ligne la plus ancienne (déjà comptée) est conservée
+    min_pos, max_pos = start + int(tail.argmin()), start + int(tail.argmax())
+    if values[min_pos] < stats["min"]:
+        stats.update(min=values[min_pos], min_date=_label(dates, min_pos))
+    if values[max_pos] > stats["max"]:
+        stats.update(max=values[max_pos], max_date=_label(dates, max_pos))
+    count = len(values)
+    mean = (stats["mean"] * stats["count"] + tail.sum()) / count
+    stats.update(count=count, **_center(values, dates, mean))
+    return stats
@@ -0,0 +1,386 @@
+"""Entrepôt local des jeux de données (DuckDB, un seul fichier).
+
+Les fichiers importés et les données générées y sont écrits une fois, avec un
+numéro de version par nom (réimporter un contenu identique ne crée pas de
+nouvelle version). Statistiques par période, évolution sur une fenêtre,
+totaux annuels et séries agrégées des graphiques sont calculés en SQL par
+DuckDB, sans charger les lignes dans pandas ; seuls les résultats (quelques
+lignes ou quelques milliers de périodes) en sortent.
+"""
+import hashlib
+import os
+import threading
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.charts import MAX_POINTS
+from core.schema import DATE_DTYPE, ENTITY, normalize
+
+STORE_PATH = os.environ.get("BI_STORE_PATH", os.path.join("data", "store.duckdb"))
+
+# Granularités des graphiques, de la plus fine à la plus grossière (cf. core.rollups.LEVELS)
+LEVELS = {
+    "Jour": "day",
+    "Semaine": "week",
+    "Mois": "month",
+    "Trimestre": "quarter",
+    "Année": "year",
+}
+
+SCHEMA = """
+CREATE SEQUENCE IF NOT EXISTS dataset_ids;
+CREATE TABLE IF NOT EXISTS datasets (
+    id INTEGER PRIMARY KEY DEFAULT nextval('dataset_ids'),
+    name VARCHAR NOT NULL,
+    version INTEGER NOT NULL,
+    checksum VARCHAR NOT NULL,
+    rows BIGINT NOT NULL,
+    created TIMESTAMP NOT NULL DEFAULT current_timestamp
+);
+CREATE TABLE IF NOT EXISTS sales (
+    dataset_id INTEGER NOT NULL,
+    row BIGINT NOT NULL,
+    date DATE,
+    revenue DOUBLE,
+    entity VARCHAR
+);
+-- Entrepôts créés avant la colonne entity (magasin... d'un jeu fusionné fichier par fichier)
+ALTER TABLE sales ADD COLUMN IF NOT EXISTS entity VARCHAR;
+"""
+
+
+# Colonnes triables des pages -> colonnes de la table ``sales``
+ORDER_COLUMNS = {"Date": "date", "Sales Revenue": "revenue"}
+# Lignes lisibles (celles que garde core.schema.normalize)
+VALID = "date IS NOT NULL AND revenue IS NOT NULL"
+
+
+def _columns(df):
+    # Dates et CA en tableaux NumPy, quels que soient les types (Arrow ou non) de ``df``
+    return (pd.to_datetime(df["Date"], errors="coerce").to_numpy(dtype=DATE_DTYPE),
+            df["Sales Revenue"].to_numpy(dtype="float64"))
+
+
+def _entities(df):
+    # Entité de chaque ligne (texte), ou None si ``df`` n'a pas de colonne d'entité
+    if ENTITY not in df:
+        return None
+    return df[ENTITY].astype("string").to_numpy(dtype=object, na_value=None)
+
+
+def checksum(df):
+    """Empreinte du contenu (Date, Sales Revenue et, s'il y en a une, entité) d'un DataFrame."""
+    dates, revenues = _columns(df)
+    content = pd.DataFrame({"Date": dates, "Sales Revenue": revenues})
+    entities = _entities(df)
+    if entities is not None:
+        content[ENTITY] = entities
+    hashes = pd.util.hash_pandas_object(content, index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+
+
+def _where(start, end, entity=None):
+    # Filtre de dates écrit en clair (et non ``? IS NULL OR ...``) pour que
+    # DuckDB puisse écarter les blocs de lignes hors période
+    clauses, params = ["dataset_id = ?"], []
+    if entity is not None:
+        clauses.append("entity = ?")
+        params.append(entity)
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(pd.Timestamp(start).date())
+    if end is not None:
+        clauses.append("date <= ?")
+        params.append(pd.Timestamp(end).date())
+    return " AND ".join(clauses), params
+
+
+def _frame(rows):
+    # Lignes lues au schéma des pages ; la colonne d'entité n'est gardée que si elle est renseignée
+    if rows[ENTITY].isna().all():
+        rows = rows.drop(columns=ENTITY)
+    return normalize(rows).frame
+
+
+class DatasetStore:
+    """Jeux de données versionnés dans une base DuckDB.
+
+    Une connexion par entrepôt ; chaque requête passe par son propre curseur,
+    ce qui permet de partager l'entrepôt entre les sessions Streamlit.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        import duckdb
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.connection = duckdb.connect(path)
+        self.connection.execute(SCHEMA)
+        self._write_lock = threading.Lock()
+
+    def _query(self, sql, params=()):
+        cursor = self.connection.cursor()
+        try:
+            return cursor.execute(sql, params).df()
+        finally:
+            cursor.close()
+
+    def _fetchone(self, sql, params=()):
+        cursor = self.connection.cursor()
+        try:
+            return cursor.execute(sql, params).fetchone()
+        finally:
+            cursor.close()
+
+    # --- Écriture ---------------------------------------------------------
+
+    def ingest(self, name, df):
+        """Écrit ``df`` (colonnes Date et Sales Revenue) sous ``name`` ; renvoie l'identifiant de la version.
+
+        La colonne ``Fichier`` (:data:`core.schema.ENTITY`, un magasin par
+        fichier importé), si ``df`` en a une, est gardée : les requêtes
+        peuvent alors être limitées à une entité. Un contenu déjà présent
+        sous ce nom n'est pas réécrit : l'identifiant de la version
+        existante est renvoyé.
+        """
+        digest = checksum(df)
+        dates, revenues = _columns(df)
+        entities = _entities(df)
+        incoming = pd.DataFrame({
+            "row": np.arange(len(df), dtype="int64"),
+            "date": dates,
+            "revenue": revenues,
+            "entity": pd.Series(entities if entities is not None else [None] * len(df), dtype="string"),
+        })
+        with self._write_lock:
+            cursor = self.connection.cursor()
+            try:
+                existing = cursor.execute(
+                    "SELECT id FROM datasets WHERE name = ? AND checksum = ? "
+                    "ORDER BY version DESC LIMIT 1", [name, digest]).fetchone()
+                if existing is not None:
+                    return existing[0]
+                cursor.execute("BEGIN TRANSACTION")
+                try:
+                    (dataset_id,) = cursor.execute(
+                        "INSERT INTO datasets (name, version, checksum, rows) "
+                        "SELECT ?, coalesce(max(version), 0) + 1, ?, ? FROM datasets WHERE name = ? "
+                        "RETURNING id", [name, digest, len(df), name]).fetchone()
+                    cursor.register("incoming", incoming)
+                    # Lignes triées par date : les filtres de période sautent des blocs entiers
+                    cursor.execute(
+                        "INSERT INTO sales (dataset_id, row, date, revenue, entity) "
+                        "SELECT ?, row, CAST(date AS DATE), revenue, entity "
+                        "FROM incoming ORDER BY date, row", [dataset_id])
+                    cursor.unregister("incoming")
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
+                return dataset_id
+            finally:
+                cursor.close()
+
+    # --- Catalogue --------------------------------------------------------
+
+    def datasets(self):
+        """Dernière version de chaque jeu de données : id, name, version, rows, created."""
+        return self._query(
+            "SELECT id, name, version, rows, created FROM datasets "
+            "QUALIFY row_number() OVER (PARTITION BY name ORDER BY version DESC) = 1 "
+            "ORDER BY name")
+
+    def versions(self, name):
+        return self._query(
+            "SELECT id, name, version, rows, created FROM datasets WHERE name = ? "
+            "ORDER BY version DESC", [name])
+
+    # --- Requêtes ---------------------------------------------------------
+
+    def entities(self, dataset_id):
+        """Entités (magasins...) du jeu de données, triées ; liste vide s'il n'en a pas."""
+        return self._query(
+            "SELECT DISTINCT entity FROM sales WHERE dataset_id = ? AND entity IS NOT NULL ORDER BY 1",
+            [dataset_id])["entity"].tolist()
+
+    # Toutes les requêtes suivantes peuvent être limitées à une entité (``entity``)
+
+    def bounds(self, dataset_id, entity=None):
+        """Première et dernière date du jeu de données (``datetime.date``)."""
+        where, params = _where(None, None, entity)
+        first, last = self._fetchone(
+            f"SELECT min(date), max(date) FROM sales WHERE {where}", [dataset_id, *params])
+        return first, last
+
+    def frame(self, dataset_id, entity=None):
+        """Lignes du jeu de données dans leur ordre d'import, au schéma des pages (:mod:`core.schema`)."""
+        where, params = _where(None, None, entity)
+        return _frame(self._query(
+            f"SELECT date AS \"Date\", revenue AS \"Sales Revenue\", entity AS \"{ENTITY}\" "
+            f"FROM sales WHERE {where} ORDER BY row", [dataset_id, *params]))
+
+    def count(self, dataset_id, start=None, end=None, entity=None):
+        """Nombre de lignes entre ``start`` et ``end`` (bornes incluses)."""
+        where, params = _where(start, end, entity)
+        (count,) = self._fetchone(
+            f"SELECT count(*) FROM sales WHERE {where} AND {VALID}", [dataset_id, *params])
+        return count
+
+    def page(self, dataset_id, column="Date", descending=False, start=None, end=None, limit=100, offset=0,
+             entity=None):
+        """Lignes ``offset`` à ``offset + limit`` triées par ``column``, au schéma des pages.
+
+        Même ordre que :func:`core.table.sort_index` (tri stable : à valeur
+        égale, ordre d'import, inversé avec ``descending``) ; seule la page
+        sort de DuckDB.
+        """
+        where, params = _where(start, end, entity)
+        direction = "DESC" if descending else "ASC"
+        return _frame(self._query(f"""
+            SELECT date AS "Date", revenue AS "Sales Revenue", entity AS "{ENTITY}" FROM sales
+            WHERE {where} AND {VALID}
+            ORDER BY {ORDER_COLUMNS[column]} {direction}, row {direction}
+            LIMIT ? OFFSET ?""", [dataset_id, *params, int(limit), int(offset)]))
+
+    def summary(self, dataset_id, start=None, end=None, entity=None):
+        """Statistiques du CA entre ``start`` et ``end`` (bornes incluses), au format de :func:`core.stats.summarize`.
+
+        À valeur égale, la date retenue est celle de la ligne importée en
+        premier. Renvoie ``None`` si aucune ligne ne tombe dans l'intervalle.
+        """
+        where, params = _where(start, end, entity)
+        result = self._query(f"""
+            WITH selected AS (SELECT row, date, revenue FROM sales WHERE {where}),
+            totals AS (
+                SELECT count(*) AS count,
+                       min(revenue) AS min, arg_min(date, {{'v': revenue, 'r': row}}) AS min_date,
+                       max(revenue) AS max, arg_max(date, {{'v': revenue, 'r': -row}}) AS max_date,
+                       avg(revenue) AS mean, median(revenue) AS median
+                FROM selected)
+            SELECT totals.*,
+                   (SELECT arg_min(date, {{'d': abs(revenue - totals.mean), 'r': row}}) FROM selected) AS mean_date,
+                   (SELECT arg_min(date, {{'d': abs(revenue - totals.median), 'r': row}}) FROM selected) AS median_date
+            FROM totals""", [dataset_id, *params])
+        stats = result.iloc[0].to_dict()
+        if stats["count"] == 0:
+            return None
+        stats["count"] = int(stats["count"])
+        for key in ("min_date", "max_date", "mean_date", "median_date"):
+            stats[key] = pd.Timestamp(stats[key]).strftime("%Y-%m-%d")
+        return stats
+
+    def window_growth(self, dataset_id, window_size, entity=None):
+        """Évolution sur ``window_size`` mois calendaires, au format de :meth:`core.growth.GrowthTable.window`."""
+        where, params = _where(None, None, entity)
+        return self._query(f"""
+            WITH monthly AS (
+                SELECT date_trunc('month', date) AS month, sum(revenue) AS revenue
+                FROM sales WHERE {where} AND date IS NOT NULL GROUP BY 1),
+            months AS (
+                SELECT unnest(generate_series(min(month), max(month), INTERVAL 1 MONTH)) AS month
+                FROM monthly),
+            shifted AS (
+                SELECT months.month, monthly.revenue,
+                       lag(monthly.revenue, {int(window_size)}) OVER (ORDER BY months.month) AS previous
+                FROM months LEFT JOIN monthly USING (month))
+            SELECT strftime(month, '%Y-%m-%d') AS "Date",
+                   revenue - previous AS "Évolution",
+                   CASE WHEN previous <> 0 THEN (revenue - previous) / previous * 100 END AS "Croissance (%)"
+            FROM shifted ORDER BY month""", [dataset_id, *params])
+
+    def day_totals(self, dataset_id, entity=None):
+        """CA total par jour (jours sans donnée exclus), au format de :meth:`core.rollups.Rollups.day_totals`."""
+        where, params = _where(None, None, entity)
+        days = self._query(
+            "SELECT date, sum(revenue) AS total FROM sales "
+            f"WHERE {where} AND {VALID} GROUP BY 1 ORDER BY 1",
+            [dataset_id, *params])
+        return pd.Series(days["total"].to_numpy(), index=pd.DatetimeIndex(days["date"]).astype(DATE_DTYPE),
+                         name="sum")
+
+    def year_totals(self, dataset_id, entity=None):
+        """CA total par année (années sans donnée exclues), au format de :meth:`core.rollups.Rollups.year_totals`."""
+        where, params = _where(None, None, entity)
+        years = self._query(
+            "SELECT year(date) AS year, sum(revenue) AS total FROM sales "
+            f"WHERE {where} AND date IS NOT NULL GROUP BY 1 HAVING count(revenue) > 0 ORDER BY 1",
+            [dataset_id, *params])
+        return pd.Series(years["total"].to_numpy(), index=years["year"].to_numpy(),
+                         name="Chiffre d'affaires")
+
+    def chart_frame(self, dataset_id, start=None, end=None, max_points=MAX_POINTS, entity=None):
+        """CA total par période au niveau le plus fin tenant dans ``max_points`` (cf. :meth:`core.rollups.Rollups.chart_frame`)."""
+        where, params = _where(start, end, entity)
+        counts = self._query(
+            "SELECT " + ", ".join(
+                f"count(DISTINCT date_trunc('{unit}', date)) FILTER (WHERE revenue IS NOT NULL) AS \"{name}\""
+                for name, unit in LEVELS.items())
+            + f" FROM sales WHERE {where}", [dataset_id, *params]).iloc[0]
+        name = next((name for name in LEVELS if counts[name] <= max_points), "Année")
+        view = self._query(f"""
+            SELECT strftime(date_trunc('{LEVELS[name]}', date), '%Y-%m-%d') AS "Date",
+                   sum(revenue) AS "Sales Revenue"
+            FROM sales WHERE {where} AND revenue IS NOT NULL
+            GROUP BY 1 ORDER BY 1""", [dataset_id, *params])
+        return name, view
+
+
+class StoredDataset:
+    """Version d'un jeu de l'entrepôt, avec les mêmes attributs que :data:`core.loader.DatasetVersion`, sauf ``frame``.
+
+    ``rollups.chart_frame``, ``rollups.day_totals``, ``rollups.year_totals``
+    et ``growth.window`` sont des requêtes SQL, comme :meth:`bounds`,
+    :meth:`count` et :meth:`page` (tableau paginé, voir
+    :func:`core.table.stored_table`). Les lignes ne sont jamais gardées en
+    mémoire : :meth:`load` les lit toutes, pour un export, et ne les
+    conserve pas. Avec ``entity``, seules les lignes de cette entité
+    (magasin...) sont lues.
+    """
+
+    def __init__(self, store, dataset_id, entity=None):
+        self.store = store
+        self.dataset_id = dataset_id
+        self.entity = entity
+        self.key = (store.path, dataset_id, entity)
+        self.rollups = self.growth = self
+
+    @cached_property
+    def stats(self):
+        return self.store.summary(self.dataset_id, entity=self.entity)
+
+    def load(self):
+        return self.store.frame(self.dataset_id, self.entity)
+
+    def bounds(self):
+        return self.store.bounds(self.dataset_id, self.entity)
+
+    def count(self, start=None, end=None):
+        return self.store.count(self.dataset_id, start, end, self.entity)
+
+    def page(self, column="Date", descending=False, start=None, end=None, limit=100, offset=0):
+        return self.store.page(self.dataset_id, column, descending, start, end, limit, offset, self.entity)
+
+    def summary(self, start=None, end=None):
+        return self.store.summary(self.dataset_id, start, end, self.entity)
+
+    def chart_frame(self, start=None, end=None, max_points=MAX_POINTS):
+        return self.store.chart_frame(self.dataset_id, start, end, max_points, self.entity)
+
+    def day_totals(self):
+        return self.store.day_totals(self.dataset_id, self.entity)
+
+    def year_totals(self):
+        return self.store.year_totals(self.dataset_id, self.entity)
+
+    def window(self, window_size):
+        return self.store.window_growth(self.dataset_id, window_size, self.entity)
+
+
+@st.cache_resource(show_spinner=False)
+def dataset_store(path=STORE_PATH):
+    """Entrepôt partagé par toutes les sessions."""
+    return DatasetStore(path)
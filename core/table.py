@@ -0,0 +1,133 @@
+"""Tableau paginé côté serveur.
+
+``st.dataframe(df)`` envoie toutes les lignes au navigateur à chaque
+exécution. :func:`paged_table` garde les lignes sur le serveur et n'envoie
+que la page affichée : le tri passe par un ordre précalculé par colonne
+(tri stable, calculé une fois par jeu de données et partagé entre les
+sessions), le filtre de dates par une recherche dichotomique dans cet
+ordre. Le coût d'un affichage dépend de la taille de la page, pas de celle
+du jeu de données. :func:`stored_table` fait de même en SQL pour les jeux
+de l'entrepôt (:mod:`core.store`).
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core.charts import date_bounds, date_slider
+
+PAGE_SIZES = [50, 100, 500, 1000]
+
+
+def sort_order(df, column):
+    """Positions des lignes de ``df`` triées par ``column`` (tri stable) et valeurs triées."""
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.cat.codes
+    values = values.to_numpy()
+    order = np.argsort(values, kind="stable")
+    return order, values[order]
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def sort_index(key, column, _df):
+    """Comme :func:`sort_order`, calculé une fois par ``key`` et partagé entre les sessions."""
+    return sort_order(_df, column)
+
+
+def _rows(key, df, column, descending, start, end, categories, sort):
+    # Positions des lignes retenues, dans l'ordre d'affichage
+    order, _ = sort(key, column, df)
+    mask = None
+    if start is not None:
+        by_date, dates = sort(key, "Date", df)
+        lo = np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left")
+        hi = np.searchsorted(dates, np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1)), side="left")
+        if column == "Date" and not categories:
+            # Tri par date : la période est déjà un intervalle de l'ordre
+            rows = order[lo:hi]
+            return rows[::-1] if descending else rows
+        mask = np.zeros(len(df), dtype=bool)
+        mask[by_date[lo:hi]] = True
+    for name, selected in categories.items():
+        values = df[name]
+        keep = np.isin(values.cat.codes.to_numpy(), values.cat.categories.get_indexer(selected))
+        mask = keep if mask is None else mask & keep
+    rows = order if mask is None else order[mask[order]]
+    return rows[::-1] if descending else rows
+
+
+def _controls(columns, bounds, widget_key, page_sizes):
+    # Tri, ordre, taille de page et période : (colonne, décroissant, taille, début, fin)
+    sort_column, direction, page_size = st.columns(3)
+    column = sort_column.selectbox("Trier par", columns, key=f"{widget_key}_sort")
+    descending = direction.radio("Ordre", ["Croissant", "Décroissant"], horizontal=True,
+                                 key=f"{widget_key}_order") == "Décroissant"
+    size = page_size.selectbox("Lignes par page", page_sizes, index=min(1, len(page_sizes) - 1),
+                               key=f"{widget_key}_size")
+    start = end = None
+    if bounds is not None:
+        period = date_slider(*bounds, key=f"{widget_key}_dates", label="Filtrer par date")
+        if period != bounds:
+            start, end = period
+    return column, descending, size, start, end
+
+
+def _page(count, size, widget_key):
+    # Numéro de page choisi (ramené à 1 si la sélection a rétréci) et nombre de pages
+    pages = max(-(-count // size), 1)
+    page_key = f"{widget_key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        # La sélection a rétréci : retour à la première page
+        st.session_state[page_key] = 1
+    return st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key), pages
+
+
+def _show(shown, first, count, page, pages, total):
+    st.caption(f"Lignes {min(first + 1, count):,} à {first + len(shown):,} "
+               f"sur {count:,} (page {page} / {pages}, {total:,} lignes au total)")
+    st.dataframe(shown, use_container_width=True,
+                 column_config={"Date": st.column_config.DateColumn("Date", format="YYYY-MM-DD")})
+
+
+def paged_table(key, df, widget_key="table", page_sizes=PAGE_SIZES, sort=sort_index):
+    """Affiche ``df`` page par page, trié et filtré sur le serveur ; renvoie la page affichée.
+
+    ``key`` identifie la version du jeu de données (voir :func:`sort_index`) ;
+    ``widget_key`` préfixe les clés des widgets, pour plusieurs tableaux par page.
+    ``sort`` fournit les ordres de tri (même signature que :func:`sort_index`,
+    par exemple gardés dans la session pour un jeu propre à la session).
+    """
+    columns = list(df.columns)
+    bounds = date_bounds(df) if "Date" in df and len(df) else None
+    column, descending, size, start, end = _controls(columns, bounds, widget_key, page_sizes)
+    categories = {}
+    for name in columns:
+        if isinstance(df[name].dtype, pd.CategoricalDtype):
+            selected = st.multiselect(name, list(df[name].cat.categories), key=f"{widget_key}_{name}")
+            if selected:
+                categories[name] = selected
+
+    rows = _rows(key, df, column, descending, start, end, categories, sort)
+    page, pages = _page(len(rows), size, widget_key)
+    first = (page - 1) * size
+    shown = df.iloc[rows[first:first + size]]
+    _show(shown, first, len(rows), page, pages, len(df))
+    return shown
+
+
+def stored_table(dataset, widget_key="table", page_sizes=PAGE_SIZES):
+    """Comme :func:`paged_table`, pour un :class:`core.store.StoredDataset`.
+
+    Tri, filtre de dates et découpage en pages sont faits en SQL
+    (``ORDER BY ... LIMIT ... OFFSET``) : seule la page affichée est lue dans
+    l'entrepôt, les lignes du jeu de données ne sont jamais chargées.
+    """
+    bounds = dataset.bounds()
+    column, descending, size, start, end = _controls(
+        ["Date", "Sales Revenue"], bounds if bounds[0] is not None else None, widget_key, page_sizes)
+    count = dataset.count(start, end)
+    page, pages = _page(count, size, widget_key)
+    first = (page - 1) * size
+    shown = dataset.page(column, descending, start, end, limit=size, offset=first)
+    _show(shown, first, count, page, pages, count if start is None else dataset.count())
+    return shown
@@ -0,0 +1,86 @@
+"""Préchauffage des caches au démarrage d'un processus Streamlit.
+
+Après un redémarrage (mise à l'échelle, déploiement), tout est froid : le
+premier visiteur de chaque page attend l'import des bibliothèques lourdes,
+la lecture du jeu de données par défaut et la construction de ses index.
+:func:`start_warm_up`, appelé en tête de chaque page, lance une seule fois
+par processus :func:`warm_up` dans un thread en arrière-plan : la page
+s'affiche sans l'attendre, et les calculs déjà en cours ne sont pas refaits
+(les caches ``st.cache_resource`` attendent le calcul en cours pour une même
+clé).
+
+Lancé en ligne de commande (par exemple à la construction de l'image),
+écrit la copie Parquet du CSV par défaut, que les processus suivants lisent
+directement, et affiche le temps de chaque étape :
+
+    python -m core.warmup times_series.csv
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+
+import streamlit as st
+
+from core.loader import load_incremental, load_range_index
+from core.rolling import DEFAULT_WINDOW, rolling_table
+from core.store import dataset_store
+
+DEFAULT_DATASET = "times_series.csv"
+# Bibliothèques importées à la demande par les pages (lecture Parquet / CSV, entrepôt, exports, graphiques)
+HEAVY_MODULES = ["pyarrow", "pyarrow.parquet", "pyarrow.csv", "duckdb", "xlsxwriter", "openpyxl",
+                 "matplotlib.figure"]
+
+
+def _import_modules():
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def warm_up(path=DEFAULT_DATASET):
+    """Importe les bibliothèques lourdes, ouvre l'entrepôt et prépare le jeu de données ``path``.
+
+    Le jeu de données est lu (voir :func:`core.loader.load_incremental`),
+    puis son index par intervalle et ses statistiques glissantes par défaut
+    sont construits. Renvoie la durée (s) de chaque étape.
+    """
+    timings = {}
+
+    def timed(name, function):
+        start = time.perf_counter()
+        result = function()
+        timings[name] = round(time.perf_counter() - start, 3)
+        return result
+
+    timed("modules", _import_modules)
+    timed("entrepôt", dataset_store)
+    if os.path.exists(path):
+        version = timed("chargement", lambda: load_incremental(path))
+        timed("index par intervalle", lambda: load_range_index(path))
+        timed("tendance glissante", lambda: rolling_table(
+            (version.key, "jours"), DEFAULT_WINDOW, version.rollups.day_totals))
+    return timings
+
+
+@st.cache_resource(show_spinner=False)
+def start_warm_up(path=DEFAULT_DATASET):
+    """Lance :func:`warm_up` une fois par processus, dans un thread en arrière-plan."""
+    thread = threading.Thread(target=warm_up, args=(path,), name="warm-up", daemon=True)
+    try:
+        # Le thread hérite du contexte de la session qui l'a lancé : sans lui, chaque
+        # appel de cache signale l'absence de contexte. Aucun élément n'y est affiché.
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+        add_script_run_ctx(thread, get_script_run_ctx())
+    except ImportError:
+        pass
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    for stage, seconds in warm_up(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DATASET).items():
+        print(f"{stage:>22} {seconds * 1000:8.0f} ms")
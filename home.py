@@ -1,5 +1,10 @@
 import streamlit as st
 
+from core.warmup import start_warm_up
+
+# Préchauffage des caches des autres pages (une fois par processus, en arrière-plan) :
+# la page d'accueil est la première ouverte après un démarrage
+start_warm_up()
 
 # Affichage du mode d'emploi
 st.markdown(
@@ -1,10 +1,17 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
-from datetime import datetime
-from io import BytesIO
 import os
 
+from core.charts import date_bounds, date_slider, growth_bar_trace, line_trace, zoom
+from core.export import FORMATS, export_button
+from core.loader import load_incremental, load_range_index
+from core.profiling import RunProfiler, figure_bytes, frame_bytes
+from core.registry import view
+from core.rolling import DEFAULT_WINDOW, rolling_table
+from core.store import StoredDataset, dataset_store
+from core.table import paged_table, stored_table
+from core.warmup import start_warm_up
+
 # Configuration de la page
 st.set_page_config(
     page_title="Outil de comparaison des chiffres d'affaires",
@@ -15,36 +22,256 @@ st.markdown(
     "<h1 style='text-align: center;'>Outil de comparaison des chiffres d'affaires</h1>",
     unsafe_allow_html=True)
 
+# Préchauffage des caches (une fois par processus, en arrière-plan)
+start_warm_up()
+
+# Mesure du temps de chaque étape (panneau dans la barre latérale)
+profiler = RunProfiler("demo")
+
 # Définition du chemin vers le fichier CSV
 file_path = "times_series.csv"
 
+# Sources : le fichier CSV s'il existe, puis les jeux de données de l'entrepôt
+store = dataset_store()
+sources = {file_path: ("fichier", file_path)} if os.path.exists(file_path) else {}
+for row in store.datasets().itertuples():
+    sources[f"{row.name} (version {row.version}, entrepôt)"] = ("entrepôt", row.id)
+
 # Vérification de l'existence du fichier
-if os.path.exists(file_path):
-    st.write("Fichier trouvé :", file_path)
-    # Lecture du fichier CSV
-    df = pd.read_csv(file_path, usecols=["Date", "Sales Revenue"])
-    min_val = df["Sales Revenue"].min().round(2)
-    min_date = df.loc[df["Sales Revenue"].idxmin()]["Date"]
-    max_val = df["Sales Revenue"].max().round(2)
-    max_date = df.loc[df["Sales Revenue"].idxmax()]["Date"]
-    mean_val = df["Sales Revenue"].mean().round(2)
-    mean_date = df.iloc[df['Sales Revenue'].sub(
-        mean_val).abs().idxmin()]["Date"]
-    median_val = df["Sales Revenue"].median().round(2)
-    median_date = df.iloc[df['Sales Revenue'].sub(
-        median_val).abs().idxmin()]["Date"]
+if sources:
+    kind, source = sources[st.selectbox("Jeu de données", list(sources))]
+    if kind == "fichier":
+        st.write("Fichier trouvé :", file_path)
+    with profiler.stage("chargement") as stage:
+        if kind == "fichier":
+            # Lecture du fichier CSV : seules les lignes ajoutées depuis la dernière lecture
+            # sont lues, et les statistiques, agrégats et évolutions mis à jour en conséquence
+            dataset = load_incremental(file_path)
+            # Vue de la session sur les lignes partagées par toutes les sessions
+            df = view(dataset.frame)
+            bounds = date_bounds(df)
+        else:
+            # Statistiques, agrégats, évolutions, tableau et bornes calculés en SQL par
+            # l'entrepôt : les lignes ne sont lues qu'à l'export, et pas gardées en mémoire
+            dataset = StoredDataset(store, source)
+            df = None
+            bounds = dataset.bounds()
+        stage["rows"] = dataset.stats["count"]
+    stats = dataset.stats
+    min_val = round(float(stats["min"]), 2)
+    min_date = stats["min_date"]
+    max_val = round(float(stats["max"]), 2)
+    max_date = stats["max_date"]
+    mean_val = round(float(stats["mean"]), 2)
+    mean_date = stats["mean_date"]
+    median_val = round(float(stats["median"]), 2)
+    median_date = stats["median_date"]
 
 else:
     st.error("Fichier introuvable :", file_path)
     st.stop()
-fig = go.Figure()
-fig.add_trace(
-    go.Scatter(
-        x=df["Date"],
-        y=df["Sales Revenue"],
-        mode='lines',
-        name="CA",
-        hovertemplate="CA: %{y}<extra></extra>"))
+# Chaque onglet interactif est un fragment : un changement de curseur, de date,
+# de fenêtre ou de format ne réexécute que le fragment concerné, avec les
+# données qui lui sont passées explicitement (le fichier n'est pas relu)
+
+@st.fragment
+def overview_chart(dataset, bounds, profiler):
+    with profiler.fragment("vue globale") as profiler:
+        # Série servie par le niveau d'agrégat adapté à la période, puis décimée
+        with profiler.stage("graphique vue globale") as stage:
+            level, view = dataset.rollups.chart_frame(
+                *date_slider(*bounds, key="zoom_overview"))
+            if level != "Jour":
+                st.caption(f"CA agrégé par {level.lower()}")
+            fig = go.Figure()
+            fig.add_trace(
+                line_trace(
+                    view["Date"],
+                    view["Sales Revenue"],
+                    name="CA",
+                    hovertemplate="CA: %{y}<extra></extra>"))
+            stage.update(rows=len(view), bytes=figure_bytes(fig))
+            st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def data_table(dataset, df, profiler):
+    with profiler.fragment("tableau") as profiler:
+        # Seule la page affichée est envoyée au navigateur (tri et filtres sur le serveur)
+        with profiler.stage("tableau", rows=dataset.stats["count"]) as stage:
+            if df is None:
+                page = stored_table(dataset, widget_key="table")
+            else:
+                page = paged_table(dataset.key, df, widget_key="table")
+            stage["bytes"] = frame_bytes(page)
+
+
+@st.fragment
+def period_statistics(bounds, period_summary, profiler):
+    with profiler.fragment("statistiques par période") as profiler:
+        # Create date inputs with the minimum and maximum dates as default values
+        # (dates typées : bornes lues sans reconvertir de chaînes)
+        first_date, last_date = bounds
+        min_date = st.date_input(
+            "Date de début",
+            value=first_date)
+        min_date_formated = min_date.strftime("%Y-%m-%d")
+        max_date = st.date_input(
+            "Date de fin",
+            value=last_date)
+        max_date_formated = max_date.strftime("%Y-%m-%d")
+        if min_date > max_date:
+            # return et non st.stop() : seul ce fragment s'interrompt
+            st.error("La date de début ne peut pas être supérieure à la date de fin.")
+            return
+        st.success(
+            f"La date de début est {min_date_formated} et la date de fin est {max_date_formated}.")
+        # Statistiques servies par l'index (ou l'entrepôt), sans reparcourir les lignes
+        with profiler.stage("statistiques par période"):
+            stats = period_summary(min_date, max_date)
+        if stats is None:
+            st.warning("Aucune donnée sur cette période.")
+            return
+        min_val = round(float(stats["min"]), 2)
+        min_date = stats["min_date"]
+        max_val = round(float(stats["max"]), 2)
+        max_date = stats["max_date"]
+        mean_val = round(float(stats["mean"]), 2)
+        mean_date = stats["mean_date"]
+        median_val = round(float(stats["median"]), 2)
+        median_date = stats["median_date"]
+        col_r, col_l = st.columns(2)
+        with col_l:
+            st.metric(
+                label="Minimum du CA",
+                value=f"{min_val}€",
+                delta=min_date)
+            st.metric(
+                label="Maximum du CA",
+                value=f"{max_val}€",
+                delta=max_date)
+        with col_r:
+            st.metric(
+                label="Moyenne du CA",
+                value=f"{mean_val}€",
+                delta=mean_date)
+            st.metric(
+                label="Médiane du CA",
+                value=f"{median_val}€",
+                delta=median_date)
+
+
+@st.fragment
+def growth_chart(dataset, bounds, profiler):
+    with profiler.fragment("évolution") as profiler:
+        window_size = st.number_input(
+            "Entrez le nombre de mois pour la comparaison",
+            min_value=1,
+            value=3,
+            step=1)
+
+        with profiler.stage("évolution") as stage:
+            # Évolution du CA par mois calendaire (toutes les fenêtres sont précalculées)
+            growth = dataset.growth.window(int(window_size))
+            period = date_slider(*bounds, key="zoom_growth")
+            level, view = dataset.rollups.chart_frame(*period)
+            growth_view = zoom(growth, *period)
+            if level != "Jour":
+                st.caption(f"CA agrégé par {level.lower()}")
+
+            fig = go.Figure()
+
+            # Ajout du graphique de ligne pour les CA
+            fig.add_trace(
+                line_trace(
+                    view["Date"],
+                    view["Sales Revenue"],
+                    name="CA",
+                    hovertemplate="CA: %{y}<extra></extra>"))
+
+            # Ajout du graphique à barres pour la Évolution du CA
+            fig.add_trace(
+                growth_bar_trace(
+                    growth_view["Date"],
+                    growth_view["Évolution"],
+                    customdata=growth_view["Croissance (%)"],
+                    name="Évolution du CA",
+                    hovertemplate=f"Évolution du CA: %{{y}}<br>Croissance: %{{customdata:.2f}} %<br>Fenêtre: {window_size} mois<extra></extra>"))
+
+            # Mise à jour du layout du graphique
+            fig.update_layout(
+                title="CA et Évolution du CA",
+                xaxis_title="Date",
+                yaxis_title="Valeur")
+            stage.update(rows=len(view) + len(growth_view), bytes=figure_bytes(fig))
+            st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def rolling_chart(dataset, bounds, profiler):
+    with profiler.fragment("tendance glissante") as profiler:
+        window_days = st.number_input(
+            "Fenêtre glissante (jours)",
+            min_value=1,
+            value=DEFAULT_WINDOW,
+            step=1)
+        shown = st.multiselect(
+            "Statistiques affichées",
+            ["Moyenne", "Médiane", "Minimum", "Maximum"],
+            default=["Moyenne", "Médiane"])
+
+        with profiler.stage("tendance glissante") as stage:
+            # Statistiques glissantes du CA journalier, calculées une fois par version et fenêtre
+            # (CA journalier lu seulement si elles ne sont pas en cache)
+            rolling = rolling_table(
+                (dataset.key, "jours"), int(window_days), dataset.rollups.day_totals)
+            rolling_view = zoom(rolling, *date_slider(*bounds, key="zoom_rolling"))
+
+            fig = go.Figure()
+            for name in shown:
+                fig.add_trace(
+                    line_trace(
+                        rolling_view["Date"],
+                        rolling_view[name],
+                        name=f"{name} sur {window_days} jours"))
+            fig.update_layout(
+                title="Tendance du CA journalier",
+                xaxis_title="Date",
+                yaxis_title="CA")
+
+            # Croissance du total de la fenêtre par rapport à la même fenêtre un an plus tôt
+            yoy = go.Figure()
+            yoy.add_trace(
+                growth_bar_trace(
+                    rolling_view["Date"],
+                    rolling_view["Croissance annuelle (%)"],
+                    name="Croissance annuelle",
+                    hovertemplate=f"Croissance sur un an: %{{y:.2f}} %<br>Fenêtre: {window_days} jours<extra></extra>"))
+            yoy.update_layout(
+                title="Croissance sur un an du CA de la fenêtre",
+                xaxis_title="Date",
+                yaxis_title="Croissance (%)")
+            stage.update(rows=len(rolling_view), bytes=figure_bytes(fig) + figure_bytes(yoy))
+            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(yoy, use_container_width=True)
+
+
+@st.fragment
+def download(dataset, df, profiler):
+    with profiler.fragment("export") as profiler:
+        # Le fichier n'est généré qu'au clic sur le bouton, puis mis en cache
+        export_format = st.radio("Format", list(FORMATS), horizontal=True)
+        with profiler.stage("export"):
+            # Jeu de l'entrepôt : lignes lues au clic seulement (voir core.export.export_bytes)
+            export_button(
+                dataset.key,
+                dataset.load if df is None else df,
+                label="Télécharger les résultats",
+                file_name="resultats",
+                fmt=export_format,
+                rows=dataset.stats["count"])
+
+
 tab1, tab2, tab3, tab4 = st.tabs(
     ["Données importés", "Statistiques général", "Série temporelle", "Télécharger les données"])
 
@@ -56,10 +283,10 @@ with tab1:
 
     right, left = st.columns(2)
     with right:
-        st.plotly_chart(fig, use_container_width=True)
+        overview_chart(dataset, bounds, profiler)
 
     with left:
-        st.dataframe(df, use_container_width=True, hide_index=True)
+        data_table(dataset, df, profiler)
 
 with tab2:
     st.markdown(
@@ -91,58 +318,11 @@ with tab2:
             value=f"{median_val}€",
             delta=median_date)
 
-    # Create date inputs with the minimum and maximum dates as default values
-    min_date = st.date_input(
-        "Date de début",
-        value=datetime.strptime(
-            df["Date"].min(),
-            "%Y-%m-%d"))
-    min_date_formated = min_date.strftime("%Y-%m-%d")
-    max_date = st.date_input(
-        "Date de fin",
-        value=datetime.strptime(
-            df["Date"].max(),
-            "%Y-%m-%d"))
-    max_date_formated = max_date.strftime("%Y-%m-%d")
-    if min_date > max_date:
-        st.error("La date de début ne peut pas être supérieure à la date de fin.")
-        st.stop()
+    if kind == "fichier":
+        period_summary = load_range_index(file_path).summary
     else:
-        st.success(
-            f"La date de début est {min_date_formated} et la date de fin est {max_date_formated}.")
-        filtered_df = df[df["Date"].between(
-            min_date_formated, max_date_formated)]
-        min_val = filtered_df["Sales Revenue"].min().round(2)
-        min_date = filtered_df.loc[filtered_df["Sales Revenue"].idxmin(
-        )]["Date"]
-        max_val = filtered_df["Sales Revenue"].max().round(2)
-        max_date = filtered_df.loc[filtered_df["Sales Revenue"].idxmax(
-        )]["Date"]
-        mean_val = filtered_df["Sales Revenue"].mean().round(2)
-        mean_date = filtered_df.iloc[filtered_df['Sales Revenue'].sub(
-            mean_val).abs().idxmin()]["Date"]
-        median_val = filtered_df["Sales Revenue"].median().round(2)
-        median_date = filtered_df.iloc[filtered_df['Sales Revenue'].sub(
-            median_val).abs().idxmin()]["Date"]
-        col_r, col_l = st.columns(2)
-        with col_l:
-            st.metric(
-                label="Minimum du CA",
-                value=f"{min_val}€",
-                delta=min_date)
-            st.metric(
-                label="Maximum du CA",
-                value=f"{max_val}€",
-                delta=max_date)
-        with col_r:
-            st.metric(
-                label="Moyenne du CA",
-                value=f"{mean_val}€",
-                delta=mean_date)
-            st.metric(
-                label="Médiane du CA",
-                value=f"{median_val}€",
-                delta=median_date)
+        period_summary = dataset.summary
+    period_statistics(bounds, period_summary, profiler)
 
 
 with tab3:
@@ -151,80 +331,16 @@ with tab3:
         unsafe_allow_html=True)
     st.info("La fenêtre est le nombre de mois pour la comparaison, par exemple si vous choisissez 3, vous allez comparer les 3 derniers mois avec les 3 mois précédents")
 
-    # Division de la page en deux colonnes
-    window_size_str = st.number_input(
-        "Entrez le nombre de mois pour la comparaison",
-        min_value=1,
-        value=3,
-        step=1)
-    try:
-        window_size = int(window_size_str)
-        if window_size <= 0:
-            st.error("Veuillez entrer un nombre de mois valide (supérieur à zéro).")
-            st.stop()
-    except ValueError:
-        st.error("Veuillez entrer un nombre entier de mois.")
-        st.stop()
-
-    fig = go.Figure()
-
-    # Ajout du graphique de ligne pour les CA
-    fig.add_trace(
-        go.Scatter(
-            x=df["Date"],
-            y=df["Sales Revenue"],
-            mode='lines',
-            name="CA",
-            hovertemplate="CA: %{y}<extra></extra>"))
-
-    # Ajout du graphique à barres pour la Évolution du CA
-    growth_column_name = f"Évolution du CA ({window_size}-Période Fenêtre)"
-    df[growth_column_name] = df['Sales Revenue'].diff(periods=window_size)
-    bar_color = ['green' if diff >
-                 0 else 'red' for diff in df[growth_column_name]]
-
-    fig.add_trace(
-        go.Bar(
-            x=df["Date"],
-            y=df[growth_column_name],
-            name="Évolution du CA",
-            marker_color=bar_color,
-            hovertemplate=f"Évolution du CA: %{{y}}<br>Périodes: {df['Date'].iloc[0]} - {df['Date'].iloc[window_size]}<extra></extra>"))
-
-    # Mise à jour du layout du graphique
-    fig.update_layout(
-        title="CA et Évolution du CA",
-        xaxis_title="Date",
-        yaxis_title="Valeur")
-    st.plotly_chart(fig, use_container_width=True)
+    growth_chart(dataset, bounds, profiler)
+
+    st.markdown(
+        "<h3 style='text-align: center;'>Tendance glissante</h3>",
+        unsafe_allow_html=True)
+    st.info("Moyenne, médiane, minimum et maximum du CA journalier sur les derniers jours, et croissance du CA de la fenêtre par rapport à la même période de l'année précédente")
+
+    rolling_chart(dataset, bounds, profiler)
 
 with tab4:
-    excel_buffer = BytesIO()
-    with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Données')
-
-        # Create a chart
-        workbook = writer.book
-        worksheet = writer.sheets['Données']
-        chart = workbook.add_chart({'type': 'line'})
-
-        # Configure the chart data
-        chart.add_series({
-            # Assuming 'Sales Revenue' is in column B
-            'values': '=Données!$B$2:$B$' + str(len(df) + 1),
-            # Assuming 'Date' is in column A
-            'categories': '=Données!$A$2:$A$' + str(len(df) + 1),
-            'name': 'CA',
-        })
-
-        # Insert the chart into the worksheet
-        worksheet.insert_chart('D2', chart)
-
-    excel_buffer.seek(0)
-
-    # Téléchargement des résultats (graphique + données)
-    st.download_button(
-        label="Télécharger les résultats",
-        data=excel_buffer,
-        file_name="resultats.xlsx",
-        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    download(dataset, df, profiler)
+
+profiler.finish()
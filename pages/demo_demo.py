@@ -1,10 +1,21 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import date
+from functools import partial
 import random
-import numpy as np
-from io import BytesIO
+
+from core.charts import growth_bar_trace, line_trace, zoom, zoom_range
+from core.export import FORMATS, export_button
+from core.generator import FREQUENCIES, generate_sales
+from core.growth import GrowthTable, growth_table
+from core.profiling import RunProfiler, figure_bytes, frame_bytes
+from core.registry import session_resource, shared_frame
+from core.rollups import Rollups, rollup_pyramid
+from core.schema import normalize
+from core.store import dataset_store
+from core.table import paged_table, sort_index, sort_order
+from core.warmup import start_warm_up
+from core.stats import summarize
 
 # Set page configuration
 st.set_page_config(
@@ -16,54 +27,137 @@ st.set_page_config(
 # Header
 st.markdown("<h1 style='text-align: center;'>Revenue Comparison Tool</h1>", unsafe_allow_html=True)
 
+# Cache warm-up (once per process, in the background)
+start_warm_up()
+
+# Per-stage timings (sidebar panel + JSONL log)
+profiler = RunProfiler("demo_demo")
+
 # Seasonality parameters
 seasonality_period = st.number_input("Enter Seasonality Period", min_value=1, value=12)
 seasonality_trend = st.selectbox("Select Seasonality Trend", ["Positive", "Negative"])
 
-# Generate random dataframe if button is clicked
-@st.cache_data(persist="disk")
-def generate_random_data():
-    start_date = datetime(2020, 1, 1)
-    end_date = datetime(2024, 1, 1)
-    sales_data = []
-    current_date = start_date
-    while current_date < end_date:
-        if seasonality_period == 3:
-            seasonality = np.sin((current_date.month % 3) * (2 * np.pi / 3)) * 1000
-        elif seasonality_period == 12:
-            seasonality = np.sin((current_date.month - 1) * (2 * np.pi / 12)) * 1000
-        if seasonality_trend == "Negative":
-            seasonality *= -1
-        sales_revenue = random.randint(5000, 20000)
-        sales_data.append({'Date': current_date.strftime('%Y-%m-%d'), 'Sales Revenue': sales_revenue + seasonality})
-        current_date += timedelta(days=random.randint(28, 35))
-    df = pd.DataFrame(sales_data)
-    return df
+# Date range, frequency and number of stores
+col_start, col_end, col_freq, col_stores = st.columns(4)
+start_date = col_start.date_input("Start Date", value=date(2020, 1, 1))
+end_date = col_end.date_input("End Date", value=date(2024, 1, 1))
+frequency = col_freq.selectbox("Frequency", FREQUENCIES)
+n_stores = col_stores.number_input("Number of Stores", min_value=1, value=1)
+
+# Generate random dataframe (vectorized, seeded: same parameters give the same data),
+# typed like every other dataset (datetime64 dates, categorical stores)
+def generate_random_data(seasonality_period, seasonality_trend, start_date, end_date, frequency, n_stores, seed):
+    return normalize(generate_sales(start=start_date, end=end_date, freq=frequency,
+                                    seasonality_period=seasonality_period, seasonality_trend=seasonality_trend,
+                                    n_series=n_stores, seed=seed)).frame
+
+
+# Table sort orders of regenerated data, kept in the session like the data itself
+def session_sort(key, column, df):
+    return session_resource(key, ("sort", column), partial(sort_order, df, column))
+
+
 button_clicked = st.button("Generate Random Data")
 
 # Generate random data and display success message
-df = generate_random_data()
+# (every session starts from the same seed, hence the same shared data, until it asks for new data)
 if button_clicked:
-    st.cache_data.clear()
-    button_clicked = True
-    st.success("Data generated successfully.")
+    st.session_state["seed"] = random.randrange(2**32)
+shared = "seed" not in st.session_state
+data_key = (seasonality_period, seasonality_trend, start_date, end_date, frequency, n_stores, st.session_state.get("seed", 0))
+with profiler.stage("génération") as stage:
+    if shared:
+        # Default seed: generated once per process for a given key, read-only and shared by all sessions
+        df = shared_frame(("generated", *data_key), partial(generate_random_data, *data_key))
+        rollups, growth, sort = rollup_pyramid(data_key, df), growth_table(data_key, df), sort_index
+    else:
+        # Regenerated data: kept in this session only (released when it regenerates or ends),
+        # so process memory does not grow with the number of users
+        df = session_resource(data_key, "frame", partial(generate_random_data, *data_key))
+        rollups = session_resource(data_key, "rollups", partial(Rollups.from_frame, df))
+        growth = session_resource(data_key, "growth", partial(GrowthTable.from_rollups, rollups))
+        sort = session_sort
+    stage["rows"] = len(df)
+if df.empty:
+    st.error("No data for this date range.")
+    st.stop()
+if button_clicked:
+    st.success(f"Data generated successfully ({len(df):,} rows).")
+
+# Interactive tabs are fragments: moving a slider or changing the window, the
+# format or the dataset name reruns only that fragment, with its inputs passed
+# explicitly (no regeneration, no statistics)
+
+@st.fragment
+def overview_chart(df, rollups, profiler):
+    with profiler.fragment("vue globale") as profiler:
+        with profiler.stage("graphique vue globale") as stage:
+            _, view = rollups.chart_frame(*zoom_range(df, key="zoom_overview", label="Displayed Period"))
+            fig = go.Figure(data=[line_trace(view["Date"], view["Sales Revenue"], name="Revenue")])
+            stage.update(rows=len(view), bytes=figure_bytes(fig))
+            st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def data_table(data_key, df, sort, profiler):
+    with profiler.fragment("tableau") as profiler:
+        # Only the visible page is sent to the browser (sorting and filters run server-side)
+        with profiler.stage("tableau", rows=len(df)) as stage:
+            page = paged_table(data_key, df, widget_key="table", sort=sort)
+            stage["bytes"] = frame_bytes(page)
+
+
+@st.fragment
+def growth_chart(df, rollups, growth, profiler):
+    with profiler.fragment("évolution") as profiler:
+        window_size = st.number_input("Number of Months for Comparison", min_value=1, value=3)
+        with profiler.stage("évolution") as stage:
+            window = growth.window(window_size)
+            period = zoom_range(df, key="zoom_growth", label="Displayed Period")
+            _, view = rollups.chart_frame(*period)
+            growth_view = zoom(window, *period)
+            fig = go.Figure()
+            fig.add_trace(line_trace(view["Date"], view["Sales Revenue"], name="Revenue"))
+            fig.add_trace(growth_bar_trace(growth_view["Date"], growth_view["Évolution"], customdata=growth_view["Croissance (%)"],
+                                           name="Revenue Growth", hovertemplate="Revenue Growth: %{y}<br>Growth: %{customdata:.2f} %<extra></extra>"))
+            fig.update_layout(title="Revenue and Revenue Growth", xaxis_title="Date", yaxis_title="Value")
+            stage.update(rows=len(view) + len(growth_view), bytes=figure_bytes(fig))
+            st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def download(data_key, df, default_name, profiler):
+    with profiler.fragment("export") as profiler:
+        export_format = st.radio("Format", list(FORMATS), horizontal=True)
+        with profiler.stage("export"):
+            export_button(data_key, df, label="Download Results", file_name="results", fmt=export_format,
+                          sheet_name="Data", series_name="Revenue")
+        # Keep the generated data in the dataset store (versioned by name, reused by the other pages)
+        dataset_name = st.text_input("Dataset Name", value=default_name)
+        if st.button("Save to Dataset Store"):
+            with profiler.stage("enregistrement", rows=len(df)):
+                dataset_store().ingest(dataset_name, df)
+            st.success(f"Saved as {dataset_name}.")
+
 
 tab_1, tab_2, tab_3, tab_4 = st.tabs(["Generated Data", "General Statistics", "Time Series", "Download Data"])
 
 # Calculate statistics
-min_val = df["Sales Revenue"].min().round(2)
-min_date = df.loc[df["Sales Revenue"].idxmin()]["Date"]
-max_val = df["Sales Revenue"].max().round(2)
-max_date = df.loc[df["Sales Revenue"].idxmax()]["Date"]
-mean_val = df["Sales Revenue"].mean().round(2)
-mean_date = df.iloc[df['Sales Revenue'].sub(mean_val).idxmin()]["Date"]
-median_val = df["Sales Revenue"].median().round(2)
-median_date = df.iloc[df['Sales Revenue'].sub(median_val).idxmin()]["Date"]
+with profiler.stage("statistiques", rows=len(df)):
+    stats = summarize(df)
+min_val = round(float(stats["min"]), 2)
+min_date = stats["min_date"]
+max_val = round(float(stats["max"]), 2)
+max_date = stats["max_date"]
+mean_val = round(float(stats["mean"]), 2)
+mean_date = stats["mean_date"]
+median_val = round(float(stats["median"]), 2)
+median_date = stats["median_date"]
 
 with tab_1: 
     st.markdown("<h3 style='text-align: center;'>Overview of generated Data</h3>", unsafe_allow_html=True)
-    st.plotly_chart(go.Figure(data=[go.Scatter(x=df["Date"], y=df["Sales Revenue"], mode='lines', name="Revenue")]), use_container_width=True)
-    st.dataframe(df, use_container_width=True)
+    overview_chart(df, rollups, profiler)
+    data_table(data_key, df, sort, profiler)
 
 with tab_2:
     st.markdown("<h3 style='text-align: center;'>Revenue Statistics</h3>", unsafe_allow_html=True)
@@ -75,23 +169,9 @@ with tab_2:
 with tab_3:
     st.markdown("<h3 style='text-align: center;'>Time Series</h3>", unsafe_allow_html=True)
     st.info("The window is the number of months for comparison.")
-    window_size = st.number_input("Number of Months for Comparison", min_value=1, value=3)
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df["Date"], y=df["Sales Revenue"], mode='lines', name="Revenue"))
-    growth_column_name = f"Revenue Growth ({window_size}-Period Window)"
-    df[growth_column_name] = df['Sales Revenue'].diff(periods=window_size)
-    bar_color = ['green' if diff > 0 else 'red' for diff in df[growth_column_name]]
-    fig.add_trace(go.Bar(x=df["Date"], y=df[growth_column_name], name="Revenue Growth", marker_color=bar_color))
-    fig.update_layout(title="Revenue and Revenue Growth", xaxis_title="Date", yaxis_title="Value")
-    st.plotly_chart(fig, use_container_width=True)
-with tab_4: 
-    excel_buffer = BytesIO()
-    with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Data')
-        workbook = writer.book
-        worksheet = writer.sheets['Data']
-        chart = workbook.add_chart({'type': 'line'})
-        chart.add_series({'values': '=Data!$B$2:$B$' + str(len(df) + 1), 'categories': '=Data!$A$2:$A$' + str(len(df) + 1), 'name': 'Revenue'})
-        worksheet.insert_chart('D2', chart)
-    excel_buffer.seek(0)
-    st.download_button(label="Download Results", data=excel_buffer, file_name="results.xlsx", mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    growth_chart(df, rollups, growth, profiler)
+
+with tab_4:
+    download(data_key, df, f"generated {start_date} {end_date} {frequency}", profiler)
+
+profiler.finish()
@@ -1,67 +1,170 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
 
+from core.charts import date_slider, growth_bar_trace, line_trace, zoom
+from core.ingest import merge_frames, read_upload, read_uploads
+from core.profiling import RunProfiler, figure_bytes, frame_bytes
+from core.store import StoredDataset, dataset_store
+from core.table import stored_table
+from core.warmup import start_warm_up
+
 # Configuration de la page
 st.set_page_config(page_title="Comparaison des Revenus de Vente", page_icon=":bar_chart:", layout="wide")
 
 # Titre de l'application
 st.title("Comparaison des Revenus de Vente")
 
-# Importer un fichier CSV ou Excel
-dataframe = st.file_uploader(label="Importer un Fichier", type=['.csv', '.xlsx'])
-
-if dataframe is not None:
-    st.write("Fichier importé avec succès")
-    df = pd.read_csv(dataframe) if dataframe.name.endswith('.csv') else pd.read_excel(dataframe)
-    
-    # Division de la page en deux colonnes
-    param_l, param_r = st.columns(2)
-    
-    # Colonne gauche : Entrée de la taille de la fenêtre
-    with param_l:
-        window_size_str = st.text_input("Entrez le nombre de mois pour la taille de la fenêtre")
-        try:
-            window_size = int(window_size_str)
-            if window_size <= 0:
-                st.error("Veuillez entrer un nombre de mois valide (supérieur à zéro).")
-                st.stop()
-        except ValueError:
-            st.error("Veuillez entrer un nombre entier de mois.")
+# Préchauffage des caches (une fois par processus, en arrière-plan)
+start_warm_up()
+
+# Mesure du temps de chaque étape (panneau dans la barre latérale)
+profiler = RunProfiler("times_series")
+
+# Entrepôt des jeux de données importés (partagé entre les sessions)
+store = dataset_store()
+
+# Importer un ou plusieurs fichiers CSV ou Excel (par exemple un par mois ou par magasin)
+uploads = st.file_uploader(label="Importer un ou plusieurs Fichiers", type=['.csv', '.xlsx'],
+                           accept_multiple_files=True)
+by_file = False
+if len(uploads) > 1:
+    by_file = st.checkbox("Un fichier par magasin (sinon : morceaux d'une même série, par exemple un par mois)")
+    merged_name = st.text_input("Nom du jeu de données fusionné", value=f"fusion de {len(uploads)} fichiers")
+upload_id = (tuple(upload.file_id for upload in uploads), by_file)
+
+if uploads and st.session_state.get("upload_id") != upload_id:
+    # Lecture par blocs (Date et Sales Revenue uniquement) puis écriture dans l'entrepôt,
+    # une seule fois par import
+    progress = st.progress(0.0, text="Lecture des fichiers...")
+    report = rejected = None
+    try:
+        with profiler.stage("lecture") as stage:
+            if len(uploads) == 1:
+                # Lignes typées (dates en datetime64) ; les lignes invalides sont écartées en bloc
+                df, rejected = read_upload(
+                    uploads[0], progress=lambda fraction: progress.progress(fraction, text="Lecture du fichier..."))
+                name = uploads[0].name
+            else:
+                # Fichiers lus en parallèle, puis fusionnés en une série triée : une date présente
+                # dans plusieurs fichiers est prise dans le dernier (lignes remplacées dans le rapport) ;
+                # un fichier par magasin : chaque ligne garde son fichier (colonne Fichier de l'entrepôt)
+                frames, report = read_uploads(
+                    uploads, progress=lambda fraction: progress.progress(fraction, text="Lecture des fichiers..."))
+                df, removed = merge_frames(frames, by_file=by_file)
+                report.insert(report.columns.get_loc("Lignes rejetées") + 1, "Lignes remplacées",
+                              report["Fichier"].map(removed).astype("Int64"))
+                name = merged_name
+            stage["rows"] = len(df)
+        if report is not None:
+            st.dataframe(report, use_container_width=True, hide_index=True)
+        if df.empty:
+            raise ValueError("aucune ligne valide (date et CA lisibles)")
+        with profiler.stage("enregistrement", rows=len(df)):
+            st.session_state["dataset_id"] = store.ingest(name, df)
+    except ValueError as error:
+        st.error(f"Fichier invalide : {error}")
+        st.stop()
+    finally:
+        progress.empty()
+    st.session_state["upload_id"] = upload_id
+    if report is None:
+        st.write("Fichier importé avec succès")
+    else:
+        failed = report["Erreur"].astype(bool).sum()
+        st.write(f"{len(report) - failed} fichiers importés avec succès ({len(df):,} lignes après fusion)")
+        if failed:
+            st.warning(f"{failed} fichiers n'ont pas pu être lus (voir la colonne Erreur).")
+        if removed.sum():
+            st.info(f"{removed.sum():,} lignes remplacées par celles d'un fichier suivant "
+                    "couvrant les mêmes dates (voir la colonne Lignes remplacées).")
+    if rejected is not None and len(rejected):
+        st.warning(f"{len(rejected):,} lignes invalides (date ou CA illisible) ont été ignorées.")
+        st.dataframe(rejected.head(100), use_container_width=True)
+
+# Les jeux déjà importés restent disponibles sans les réimporter
+stored = store.datasets()
+if stored.empty:
+    # Affichage d'une erreur si aucun fichier n'a jamais été importé
+    st.error("Veuillez importer un fichier valide")
+    st.stop()
+labels = {row.id: f"{row.name} (version {row.version}, {row.rows:,} lignes)" for row in stored.itertuples()}
+dataset_ids = list(labels)
+current = st.session_state.get("dataset_id")
+dataset_id = st.selectbox(
+    "Jeu de données",
+    dataset_ids,
+    index=dataset_ids.index(current) if current in dataset_ids else 0,
+    format_func=labels.get)
+rows = int(stored.set_index("id").at[dataset_id, "rows"])
+
+# Jeu fusionné fichier par fichier : un magasin (un fichier) ou tous les magasins
+entities = store.entities(dataset_id)
+entity = None
+if entities:
+    entity = st.selectbox("Magasin", [None, *entities], format_func=lambda name: name or "Tous les magasins")
+dataset = StoredDataset(store, dataset_id, entity)
+if entity is not None:
+    rows = dataset.count()
+
+# Division de la page en deux colonnes
+param_l, param_r = st.columns(2)
+
+# Colonne gauche : Entrée de la taille de la fenêtre
+with param_l:
+    window_size_str = st.text_input("Entrez le nombre de mois pour la taille de la fenêtre")
+    try:
+        window_size = int(window_size_str)
+        if window_size <= 0:
+            st.error("Veuillez entrer un nombre de mois valide (supérieur à zéro).")
             st.stop()
+    except ValueError:
+        st.error("Veuillez entrer un nombre entier de mois.")
+        st.stop()
+
+# Colonne droite : Affichage du paramètre de la fenêtre sélectionnée
+with param_r:
+    st.write("Paramètres de la fenêtre sélectionnée:", window_size)
+
+# Division de la page en deux colonnes
+left, right = st.columns(2)
 
-    # Colonne droite : Affichage du paramètre de la fenêtre sélectionnée
-    with param_r:
-        st.write("Paramètres de la fenêtre sélectionnée:", window_size)
+# Colonne gauche : Affichage du dataframe
 
-    # Division de la page en deux colonnes
-    left, right = st.columns(2)
+@st.fragment
+def data_table(dataset, rows, profiler):
+    # Fragment : un changement de page, de tri ou de période ne réexécute que le tableau
+    with profiler.fragment("tableau") as profiler:
+        # Seule la page affichée est lue dans l'entrepôt et envoyée au navigateur (tri et filtres en SQL)
+        with profiler.stage("tableau", rows=rows) as stage:
+            page = stored_table(dataset, widget_key="table")
+            stage["bytes"] = frame_bytes(page)
 
-    # Colonne gauche : Affichage du dataframe
 
-    st.dataframe(df, use_container_width=True)
+data_table(dataset, rows, profiler)
 
-    # Colonne droite : Affichage du graphique
+# Colonne droite : Affichage du graphique
+
+with profiler.stage("graphique") as stage:
+    # Croissance par mois calendaire et CA agrégé par période, calculés en SQL par l'entrepôt
+    growth = dataset.growth.window(window_size)
+    period = date_slider(*dataset.bounds(), key="zoom_growth")
+    level, view = dataset.rollups.chart_frame(*period)
+    growth_view = zoom(growth, *period)
 
     fig = go.Figure()
 
-    # Ajout du graphique de ligne pour les revenus de vente
-    fig.add_trace(go.Scatter(x=df["Date"], y=df["Sales Revenue"], mode='lines', name="Revenus de Vente",
+    # Ajout du graphique de ligne pour les revenus de vente (décimé pour l'affichage)
+    fig.add_trace(line_trace(view["Date"], view["Sales Revenue"], name="Revenus de Vente",
                                 hovertemplate="Revenus de Vente: %{y}<extra></extra>"))
 
     # Ajout du graphique à barres pour la croissance périodique
-    growth_column_name = f"Croissance Périodique ({window_size}-Période Fenêtre)"
-    df[growth_column_name] = df['Sales Revenue'].diff(periods=window_size)
-    bar_color = ['green' if diff > 0 else 'red' for diff in df[growth_column_name]]
-
-    fig.add_trace(go.Bar(x=df["Date"], y=df[growth_column_name], name="Croissance Périodique",
-                            marker_color=bar_color,
-                            hovertemplate=f"Croissance Périodique: %{{y}}<br>Périodes: {df['Date'].iloc[0]} - {df['Date'].iloc[window_size]}<extra></extra>"))
+    fig.add_trace(growth_bar_trace(growth_view["Date"], growth_view["Évolution"], name="Croissance Périodique",
+                            customdata=growth_view["Croissance (%)"],
+                            hovertemplate=f"Croissance Périodique: %{{y}}<br>Croissance: %{{customdata:.2f}} %<br>Fenêtre: {window_size} mois<extra></extra>"))
 
     # Mise à jour du layout du graphique
     fig.update_layout(title="Revenus de Vente et Croissance Périodique", xaxis_title="Date", yaxis_title="Valeur")
+    stage.update(rows=len(view) + len(growth_view), bytes=figure_bytes(fig))
     st.plotly_chart(fig, use_container_width=True)
 
-else:
-    # Affichage d'une erreur si aucun fichier n'est importé
-    st.error("Veuillez importer un fichier valide")
+profiler.finish()
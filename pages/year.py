@@ -1,9 +1,16 @@
 import streamlit as st
 import datetime
+from functools import partial
+import os
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from io import BytesIO
+
+from core.classification import batch_growth, category_counts, describe_growth
+from core.export import excel_bytes
+from core.loader import load_incremental
+from core.profiling import RunProfiler
+from core.report import complete_years, covered_years
+from core.store import dataset_store
+from core.warmup import start_warm_up
 
 
 # Configuration de la page
@@ -15,6 +22,33 @@ st.set_page_config(
 )
 st.title('Comparaison entre années')
 
+# Préchauffage des caches (une fois par processus, en arrière-plan)
+start_warm_up()
+
+# Mesure du temps de chaque étape (panneau dans la barre latérale)
+profiler = RunProfiler('year')
+
+# Source des chiffres d'affaires : saisie, totaux annuels du fichier chargé
+# ou d'un jeu de données de l'entrepôt (calculés en SQL), avec les années
+# couvertes de janvier à décembre (une année incomplète n'est pas comparée)
+def loaded_years(path):
+    rollups = load_incremental(path).rollups
+    return rollups.year_totals(), complete_years(rollups)
+
+
+def stored_years(store, dataset_id):
+    return store.year_totals(dataset_id), covered_years(*store.bounds(dataset_id))
+
+
+file_path = "times_series.csv"
+store = dataset_store()
+sources = {'Saisie manuelle': None}
+if os.path.exists(file_path):
+    sources[f'Données chargées ({file_path})'] = partial(loaded_years, file_path)
+for row in store.datasets().itertuples():
+    sources[f'{row.name} (version {row.version}, entrepôt)'] = partial(stored_years, store, row.id)
+source = st.selectbox('Source des chiffres d\'affaires', list(sources))
+
 # Layout en colonnes pour les entrées utilisateur
 year, ca = st.columns(2)
 
@@ -35,16 +69,36 @@ with year:
         max_value=date_actuelle.year,
         step=1)
 
+partial_years = []
 with ca:
-    st.text('Entrez le chiffre d\'affaires')
-    ca_minus_one = st.number_input(
-        'Chiffre d\'affaires année de référence',
-        min_value=0.0,
-        step=0.01)
-    ca_current = st.number_input(
-        'Chiffre d\'affaires année actuelle',
-        min_value=0.0,
-        step=0.01)
+    if sources[source] is None:
+        st.text('Entrez le chiffre d\'affaires')
+        ca_minus_one = st.number_input(
+            'Chiffre d\'affaires année de référence',
+            min_value=0.0,
+            step=0.01)
+        ca_current = st.number_input(
+            'Chiffre d\'affaires année actuelle',
+            min_value=0.0,
+            step=0.01)
+    else:
+        # Totaux annuels lus dans les agrégats du jeu de données
+        st.text('Chiffre d\'affaires issu des données chargées')
+        with profiler.stage('totaux annuels'):
+            year_totals, complete = sources[source]()
+        ca_minus_one = float(year_totals.get(year_minus_one, 0.0))
+        ca_current = float(year_totals.get(year_current, 0.0))
+        partial_years = [year for year in (year_minus_one, year_current)
+                         if year in year_totals and year not in complete]
+        st.metric(
+            'Chiffre d\'affaires année de référence',
+            f"{ca_minus_one:.2f} €")
+        st.metric(
+            'Chiffre d\'affaires année actuelle',
+            f"{ca_current:.2f} €")
+        if partial_years:
+            st.warning(f"Année incomplète dans les données : {', '.join(map(str, partial_years))}. "
+                       "Son chiffre d'affaires ne couvre pas janvier à décembre et n'est pas comparé.")
 
 # Choix des seuils pour les catégories de taux de croissance
 st.sidebar.title('Paramètres des catégories de croissance')
@@ -69,40 +123,31 @@ declin_moderé = st.sidebar.slider(
     max_value=50,
     value=-20)
 
+# Type de message affiché pour chaque catégorie
+ALERTS = {
+    "Croissance élevée": st.success,
+    "Croissance modérée": st.warning,
+    "Croissance faible": st.info,
+    "Stable": st.info,
+    "Déclin faible": st.error,
+    "Déclin modéré": st.error,
+    "Déclin important": st.error,
+}
+
 # Comparaison et affichage des résultats
 if st.button('Comparer'):
     if year_minus_one >= year_current:
         st.error("L'année de référence doit être inférieure à l'année actuelle.")
+    elif partial_years:
+        st.error("Choisissez deux années complètes pour les comparer.")
     elif year_minus_one and year_current and ca_minus_one and ca_current:
-        percent = ((ca_current - ca_minus_one) / ca_minus_one) * 100
-        if percent > croissance_elevee:
-            category = "Croissance élevée"
-            st.success(
-                f"Le chiffre d'affaires a augmenté de {ca_current - ca_minus_one:.2f} € entre {year_minus_one} et {year_current}. Le taux de croissance est de {percent:.2f} %, le taux de croissance est : {category}. ")
-        elif percent > croissance_moderée:
-            category = "Croissance modérée"
-            st.warning(
-                f"Le chiffre d'affaires a augmenté de {ca_current - ca_minus_one:.2f} € entre {year_minus_one} et {year_current}. Le taux de croissance est de {percent:.2f} %, le taux de croissance est : {category}. ")
-        elif percent > 0:
-            category = "Croissance faible"
-            st.info(
-                f"Le chiffre d'affaires a augmenté de {ca_current - ca_minus_one:.2f} € entre {year_minus_one} et {year_current}. Le taux de croissance est de {percent:.2f} %, le taux de croissance est : {category}. ")
-        elif percent == 0:
-            category = "Stable"
-            st.info(
-                f"Le chiffre d'affaires est resté stable entre {year_minus_one} et {year_current}. Le taux de croissance est de {percent:.2f} %, le taux de croissance est : {category}. ")
-        elif percent > declin_faible:
-            category = "Déclin faible"
-            st.error(
-                f"Le chiffre d'affaires a diminué de {ca_minus_one - ca_current:.2f} € entre {year_minus_one} et {year_current}. Le taux de croissance est de {percent:.2f} %, le taux de croissance est : {category}. ")
-        elif percent > declin_moderé:
-            category = "Déclin modéré"
-            st.error(
-                f"Le chiffre d'affaires a diminué de {ca_minus_one - ca_current:.2f} € entre {year_minus_one} et {year_current}. Le taux de croissance est de {percent:.2f} %, le taux de croissance est : {category}. ")
-        else:
-            category = "Déclin important"
-            st.error(
-                f"Le chiffre d'affaires a diminué de {ca_minus_one - ca_current:.2f} € entre {year_minus_one} et {year_current}. Le taux de croissance est de {percent:.2f} %, le taux de croissance est : {category}. ")
+        percent, category, message = describe_growth(
+            year_minus_one,
+            year_current,
+            ca_minus_one,
+            ca_current,
+            (croissance_elevee, croissance_moderée, declin_faible, declin_moderé))
+        ALERTS[category](message)
 
         # Création d'un DataFrame pour le graphique
         data = pd.DataFrame({
@@ -111,26 +156,22 @@ if st.button('Comparer'):
         })
 
         # Affichage du graphique
-        fig, ax = plt.subplots()
-        sns.barplot(x='Année', y='Chiffre d\'affaires', data=data, ax=ax)
-        ax.set_title('Chiffre d\'affaires par année')
-        ax.set_ylabel('Chiffre d\'affaires (€)')
-        ax.set_xlabel('Année')
-        st.pyplot(fig)
+        with profiler.stage('graphique', rows=len(data)):
+            # matplotlib n'est importé qu'au premier graphique ; la figure est créée hors
+            # de pyplot, sans registre global : elle est libérée une fois envoyée
+            from matplotlib.figure import Figure
+            fig = Figure()
+            ax = fig.subplots()
+            ax.bar(data['Année'].astype(str), data['Chiffre d\'affaires'], color=['#4c72b0', '#dd8452'])
+            ax.set_title('Chiffre d\'affaires par année')
+            ax.set_ylabel('Chiffre d\'affaires (€)')
+            ax.set_xlabel('Année')
+            st.pyplot(fig)
 
         # Création d'un fichier Excel avec les données et le graphique
-        excel_buffer = BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-            data.to_excel(writer, index=False, sheet_name='Données')
-            workbook = writer.book
-            worksheet = writer.sheets['Données']
-            chart = workbook.add_chart({'type': 'column'})
-            chart.add_series({
-                'values': '=Données!$B$2:$B$3',
-                'categories': '=Données!$A$2:$A$3',
-            })
-            worksheet.insert_chart('D2', chart)
-        excel_buffer.seek(0)
+        with profiler.stage('export', rows=len(data)) as stage:
+            excel_buffer = excel_bytes(data, sheet_name='Données', series_name=None, chart_type='column')
+            stage['bytes'] = len(excel_buffer)
 
         # Téléchargement des résultats (graphique + données)
         st.download_button(
@@ -138,3 +179,34 @@ if st.button('Comparer'):
             data=excel_buffer,
             file_name=f"resultats_{year_minus_one}_{year_current}.xlsx",
             mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+# Comparaison par lot : une ligne par entité (magasin, produit, client...) et une colonne par année
+st.divider()
+st.subheader('Comparaison par lot')
+st.info("Importez un tableau avec une colonne d'identifiant (magasin, produit, client...) et une colonne de chiffre d'affaires par année (ex: 2022, 2023). La croissance est calculée pour chaque paire d'années consécutives.")
+batch_file = st.file_uploader('Importer un tableau', type=['.csv', '.xlsx'], key='batch_file')
+if batch_file is not None:
+    table = pd.read_csv(batch_file) if batch_file.name.endswith('.csv') else pd.read_excel(batch_file)
+    entity_column = st.selectbox(
+        'Colonne identifiant les entités',
+        [column for column in table.columns if not str(column).strip().isdigit()] or list(table.columns))
+    try:
+        with profiler.stage('comparaison par lot', rows=len(table)):
+            results = batch_growth(
+                table,
+                entity_column,
+                (croissance_elevee, croissance_moderée, declin_faible, declin_moderé))
+    except ValueError as error:
+        st.error(str(error))
+    else:
+        counts, details = st.columns([1, 3])
+        with counts:
+            st.dataframe(category_counts(results), hide_index=True, use_container_width=True)
+        with details:
+            st.dataframe(
+                results,
+                hide_index=True,
+                use_container_width=True,
+                column_config={'Croissance (%)': st.column_config.NumberColumn(format='%.2f %%')})
+
+profiler.finish()
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.classification import (CATEGORIES, UNCLASSIFIED, batch_growth, category_counts, classify_growth,
+                                 describe_growth, growth_rate)
+
+THRESHOLDS = (20, 5, -5, -20)
+
+
+def chain(percent, croissance_elevee, croissance_moderee, declin_faible, declin_modere):
+    # Suite de conditions de la page year.py d'origine, un taux à la fois
+    if percent > croissance_elevee:
+        return "Croissance élevée"
+    elif percent > croissance_moderee:
+        return "Croissance modérée"
+    elif percent > 0:
+        return "Croissance faible"
+    elif percent == 0:
+        return "Stable"
+    elif percent > declin_faible:
+        return "Déclin faible"
+    elif percent > declin_modere:
+        return "Déclin modéré"
+    else:
+        return "Déclin important"
+
+
+@pytest.mark.parametrize("thresholds", [THRESHOLDS, (10, 10, -10, -10), (0, 0, 0, 0), (5, 20, 10, -30)])
+def test_boundaries_match_the_page_chain(thresholds):
+    # Taux égaux aux seuils, juste autour, zéro (et -0.0) et extrêmes
+    percent = sorted({value + delta for value in (*thresholds, 0, 1e6, -100)
+                      for delta in (-1e-9, 0, 1e-9)} | {-0.0, np.inf})
+    assert classify_growth(percent, *thresholds).tolist() == [chain(value, *thresholds) for value in percent]
+
+
+def test_random_rates_and_thresholds_match_the_page_chain():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        thresholds = tuple(rng.integers(-30, 51, 4))
+        percent = np.concatenate([rng.uniform(-100, 100, 200), rng.integers(-30, 51, 50)])
+        assert classify_growth(percent, *thresholds).tolist() == [chain(value, *thresholds) for value in percent]
+
+
+def test_rates_without_reference_revenue_are_unclassified():
+    percent = growth_rate([0.0, np.nan, 100.0, 100.0], [50.0, 50.0, np.nan, 100.0])
+    assert np.isnan(percent[:3]).all() and percent[3] == 0
+    assert classify_growth(percent, *THRESHOLDS).tolist() == [UNCLASSIFIED] * 3 + ["Stable"]
+
+
+def test_describe_growth_matches_the_page_messages():
+    percent, category, message = describe_growth(2022, 2023, 100.0, 120.0, THRESHOLDS)
+    assert (percent, category) == (20.0, "Croissance modérée")
+    assert message.startswith("Le chiffre d'affaires a augmenté de 20.00 € entre 2022 et 2023.")
+    _, category, message = describe_growth(2022, 2023, 100.0, 80.0, THRESHOLDS)
+    assert category == "Déclin important"
+    assert message.startswith("Le chiffre d'affaires a diminué de 20.00 € entre 2022 et 2023.")
+    assert describe_growth(2022, 2023, 100.0, 100.0, THRESHOLDS)[1] == "Stable"
+
+
+def test_batch_growth_has_one_row_per_entity_and_year_pair():
+    table = pd.DataFrame({
+        "Magasin": ["Lyon", "Nice", "Paris"],
+        "2023": [110.0, 0.0, 90.0],
+        2021: [100.0, 0.0, 100.0],
+        " 2022 ": [100.0, 50.0, "n/a"],
+        "Région": ["Sud", "Sud", "Nord"],
+    })
+    results = batch_growth(table, "Magasin", THRESHOLDS)
+
+    assert results["Magasin"].tolist() == ["Lyon", "Lyon", "Nice", "Nice", "Paris", "Paris"]
+    assert results["Année de référence"].tolist() == [2021, 2022] * 3
+    assert results["Année"].tolist() == [2022, 2023] * 3
+    assert results["Évolution"].tolist()[:4] == [0.0, 10.0, 50.0, -50.0]
+    assert results["Catégorie"].tolist() == [
+        "Stable", "Croissance modérée",
+        UNCLASSIFIED, "Déclin important",
+        UNCLASSIFIED, UNCLASSIFIED,
+    ]
+    expected = [chain(value, *THRESHOLDS) if np.isfinite(value) else UNCLASSIFIED
+                for value in results["Croissance (%)"]]
+    assert results["Catégorie"].tolist() == expected
+
+
+def test_category_counts_list_every_category():
+    table = pd.DataFrame({"Client": ["a", "b"], "2022": [100.0, 100.0], "2023": [130.0, 0.0]})
+    counts = category_counts(batch_growth(table, "Client", THRESHOLDS)).set_index("Catégorie")["Nombre"]
+    assert counts.index.tolist() == CATEGORIES + [UNCLASSIFIED]
+    assert counts.sum() == 2
+    assert counts["Croissance élevée"] == 1 and counts["Déclin important"] == 1
+
+
+def test_batch_growth_needs_two_year_columns():
+    with pytest.raises(ValueError, match="au moins deux colonnes d'années"):
+        batch_growth(pd.DataFrame({"Magasin": ["Lyon"], "2023": [1.0]}), "Magasin", THRESHOLDS)
@@ -0,0 +1,20 @@
+import pandas as pd
+
+from core.generator import generate_sales
+
+
+def test_monthly_dates_keep_one_date_per_month_from_a_late_start():
+    df = generate_sales(start="2020-01-31", end="2020-06-01", freq="monthly", seed=0)
+    assert df["Date"].dt.strftime("%Y-%m-%d").tolist() == [
+        "2020-01-31", "2020-02-29", "2020-03-31", "2020-04-30", "2020-05-31"]
+
+
+def test_monthly_dates_keep_the_start_day():
+    df = generate_sales(start="2021-03-15", end="2021-06-15", freq="monthly", seed=0)
+    assert df["Date"].tolist() == list(pd.date_range("2021-03-15", periods=3, freq=pd.DateOffset(months=1)))
+
+
+def test_store_column_comes_after_date_and_revenue():
+    df = generate_sales(start="2020-01-01", end="2020-03-01", freq="monthly", n_series=3, seed=0)
+    assert df.columns.tolist() == ["Date", "Sales Revenue", "Store"]
+    assert df["Store"].tolist()[:3] == ["Store 1", "Store 2", "Store 3"]
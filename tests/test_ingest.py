@@ -0,0 +1,125 @@
+import datetime
+import io
+
+import pandas as pd
+import pytest
+
+import core.ingest
+from core.ingest import merge_frames, read_csv_stream, read_excel_stream, read_upload, read_uploads
+
+
+def workbook(rows):
+    from openpyxl import Workbook
+
+    book = Workbook()
+    sheet = book.active
+    sheet.append(["Date", "Sales Revenue"])
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    book.save(buffer)
+    buffer.seek(0)
+    buffer.name = "ventes.xlsx"
+    return buffer
+
+
+ROWS = [
+    [datetime.datetime(2024, 1, 5), 1.0],
+    ["01/02/2024", 2.0],
+    ["13/02/2024", "3"],
+    ["illisible", 4],
+    ["2024-03-01", None],
+    ["02/03/2024", 6],
+]
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 100])
+def test_excel_chunks_are_typed_as_they_are_read(chunk_rows):
+    frame, rejected = read_excel_stream(workbook(ROWS), chunk_rows=chunk_rows)
+    assert frame.dtypes.astype(str).tolist() == ["datetime64[ns]", "float64"]
+    assert frame["Date"].dt.strftime("%Y-%m-%d").tolist() == ["2024-01-05", "2024-02-01", "2024-02-13", "2024-03-02"]
+    assert frame["Sales Revenue"].tolist() == [1.0, 2.0, 3.0, 6.0]
+    # Positions dans la feuille ; la date ISO ne suit pas le format (jour en premier) de la colonne
+    assert rejected.index.tolist() == [3, 4]
+
+
+def test_excel_raise_reports_sheet_rows():
+    with pytest.raises(ValueError, match="2 lignes invalides.*lignes 4, 5"):
+        read_upload(workbook(ROWS), errors="raise")
+
+
+@pytest.mark.parametrize("data", [b"pas un classeur", b"PK\x03\x04" + b"\x00" * 64])
+def test_corrupt_workbook_raises_value_error(data):
+    upload = io.BytesIO(data)
+    upload.name = "ventes.xlsx"
+    with pytest.raises(ValueError, match="Fichier Excel illisible"):
+        read_upload(upload)
+
+
+def test_csv_with_bad_revenue_keeps_good_rows():
+    upload = io.BytesIO(b"Date,Sales Revenue,Store\n2024-01-01,1.5,A\n2024-01-02,abc,A\n2024-01-03,3,B\n")
+    upload.name = "ventes.csv"
+    frame, rejected = read_upload(upload)
+    assert frame["Sales Revenue"].tolist() == [1.5, 3.0]
+    assert len(rejected) == 1
+
+
+def frame(dates, values):
+    return pd.DataFrame({"Date": pd.to_datetime(dates), "Sales Revenue": [float(value) for value in values]})
+
+
+def test_merge_keeps_rows_within_a_file():
+    merged, removed = merge_frames({"ventes.csv": frame(["2024-01-01", "2024-01-01", "2024-01-02"], [10, 20, 5])})
+    assert merged["Sales Revenue"].tolist() == [10.0, 20.0, 5.0]
+    assert removed.tolist() == [0]
+
+
+def test_merge_takes_overlapping_dates_from_the_last_file():
+    frames = {
+        "01.csv": frame(["2024-01-30", "2024-01-31", "2024-01-31", "2024-02-01"], [1, 2, 3, 4]),
+        "02.csv": frame(["2024-02-01", "2024-02-01", "2024-02-02"], [40, 41, 50]),
+    }
+    merged, removed = merge_frames(frames)
+    assert merged["Date"].dt.strftime("%m-%d").tolist() == ["01-30", "01-31", "01-31", "02-01", "02-01", "02-02"]
+    assert merged["Sales Revenue"].tolist() == [1.0, 2.0, 3.0, 40.0, 41.0, 50.0]
+    assert removed.to_dict() == {"01.csv": 1, "02.csv": 0}
+
+
+def test_merge_by_file_keeps_every_row():
+    frames = {"a.csv": frame(["2024-01-01", "2024-01-01"], [1, 2]), "b.csv": frame(["2024-01-01"], [3])}
+    merged, removed = merge_frames(frames, by_file=True)
+    assert merged["Fichier"].tolist() == ["a.csv", "a.csv", "b.csv"]
+    assert merged["Sales Revenue"].tolist() == [1.0, 2.0, 3.0]
+    assert removed.sum() == 0
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+
+def test_any_error_in_one_file_does_not_stop_the_others(monkeypatch):
+    read = core.ingest.read_upload
+
+    def read_upload(upload, **kwargs):
+        if upload.name == "b.csv":
+            raise TypeError("erreur interne")
+        return read(upload, **kwargs)
+
+    monkeypatch.setattr(core.ingest, "read_upload", read_upload)
+    data = b"Date,Sales Revenue\n2024-01-01,1\n"
+    frames, report = read_uploads([Upload("a.csv", data), Upload("b.csv", data)])
+    assert list(frames) == ["a.csv"]
+    assert report.set_index("Fichier")["Erreur"].to_dict() == {"a.csv": "", "b.csv": "erreur interne"}
+
+
+def test_csv_blocks_are_typed_as_they_are_read():
+    lines = ["Date,Sales Revenue,Store"] + [f"0{day}/02/2024,{day},A" for day in range(1, 10)]
+    lines[7] = "07/02/2024,abc,A"
+    upload = io.BytesIO(("\n".join(lines) + "\n13/02/2024,,B\n").encode())
+    # Petits blocs : le CA illisible n'est pas dans le premier ; le format jour/mois est fixé par celui-ci
+    frame, rejected = read_csv_stream(upload, block_size=64)
+    assert frame.dtypes.astype(str).tolist() == ["datetime64[ns]", "float64"]
+    assert frame["Date"].dt.day.tolist() == [1, 2, 3, 4, 5, 6, 8, 9]
+    assert rejected.index.tolist() == [6, 9]
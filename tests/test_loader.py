@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import core.loader as loader
+from core.loader import IncrementalDataset, read_dataset, sidecar_path
+from core.rollups import Rollups
+from core.stats import summarize
+
+
+def write(path, df, mode="w", header=True):
+    df.to_csv(path, mode=mode, header=header, index=False)
+
+
+def sales(start, periods, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Date": pd.date_range(start, periods=periods, freq="D").strftime("%Y-%m-%d"),
+                         "Sales Revenue": rng.uniform(0, 1000, periods).round(2)})
+
+
+def assert_matches_full_read(version, path):
+    expected = read_dataset(str(path))
+    pd.testing.assert_frame_equal(
+        pd.DataFrame({column: version.frame[column].to_numpy() for column in expected}), expected)
+    stats = summarize(expected)
+    for key in ("count", "min", "min_date", "max", "max_date", "mean_date", "median", "median_date"):
+        assert version.stats[key] == stats[key], key
+    assert version.stats["mean"] == pytest.approx(stats["mean"])
+    pd.testing.assert_series_equal(version.rollups.day_totals(), Rollups.from_frame(expected).day_totals(),
+                                   check_freq=False)
+
+
+def test_append_reads_only_new_rows(tmp_path):
+    path = tmp_path / "ventes.csv"
+    write(path, sales("2020-01-01", 100))
+    dataset = IncrementalDataset(str(path))
+    dataset.refresh()
+    write(path, sales("2020-04-10", 50, seed=1), mode="a", header=False)
+    version = dataset.refresh()
+    assert (dataset.rebuilds, dataset.appends) == (1, 1)
+    assert_matches_full_read(version, path)
+
+
+def test_changed_prefix_triggers_rebuild(tmp_path):
+    path = tmp_path / "ventes.csv"
+    df = sales("2020-01-01", 100)
+    write(path, df)
+    dataset = IncrementalDataset(str(path))
+    dataset.refresh()
+    df.loc[3, "Sales Revenue"] = 99999.0
+    write(path, pd.concat([df, sales("2020-04-10", 10, seed=1)]))
+    version = dataset.refresh()
+    assert (dataset.rebuilds, dataset.appends) == (2, 0)
+    assert version.stats["max"] == 99999.0
+    assert_matches_full_read(version, path)
+
+
+def test_incomplete_last_line_triggers_rebuild(tmp_path):
+    path = tmp_path / "ventes.csv"
+    path.write_text("Date,Sales Revenue\n2020-01-01,1\n2020-01-02,2")
+    dataset = IncrementalDataset(str(path))
+    dataset.refresh()
+    with open(path, "a") as file:
+        file.write("5\n2020-01-03,3\n")
+    version = dataset.refresh()
+    assert (dataset.rebuilds, dataset.appends) == (2, 0)
+    assert version.frame["Sales Revenue"].tolist() == [1, 25, 3]
+
+
+def test_cold_start_on_fresh_sidecar_does_not_read_csv(tmp_path, monkeypatch):
+    path = tmp_path / "ventes.csv"
+    write(path, sales("2020-01-01", 100))
+    IncrementalDataset(str(path)).refresh()
+    assert (tmp_path / "ventes.parquet").exists()
+
+    read_csv = pd.read_csv
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("CSV relu au démarrage")
+
+    monkeypatch.setattr(loader, "_checksum", unexpected)
+    # Seul l'en-tête (noms des colonnes des lignes ajoutées) peut être lu
+    monkeypatch.setattr(loader.pd, "read_csv",
+                        lambda *args, **kwargs: read_csv(*args, **kwargs) if kwargs.get("nrows") == 0
+                        else unexpected())
+    dataset = IncrementalDataset(str(path))
+    dataset.refresh()
+    monkeypatch.undo()
+
+    # Le CRC conservé dans la copie Parquet permet toujours l'ajout incrémental
+    write(path, sales("2020-04-10", 20, seed=1), mode="a", header=False)
+    version = dataset.refresh()
+    assert (dataset.rebuilds, dataset.appends) == (1, 1)
+    assert_matches_full_read(version, path)
+
+
+def test_sidecar_without_checksum_rebuilds_on_growth(tmp_path):
+    import pyarrow.parquet as pq
+
+    path = tmp_path / "ventes.csv"
+    write(path, sales("2020-01-01", 100))
+    IncrementalDataset(str(path)).refresh()
+    table = pq.read_table(sidecar_path(str(path)))
+    metadata = {key: value for key, value in table.schema.metadata.items() if key != loader.CHECKSUM_KEY}
+    pq.write_table(table.replace_schema_metadata(metadata), sidecar_path(str(path)))
+
+    dataset = IncrementalDataset(str(path))
+    dataset.refresh()
+    write(path, sales("2020-04-10", 20, seed=1), mode="a", header=False)
+    version = dataset.refresh()
+    assert (dataset.rebuilds, dataset.appends) == (2, 0)
+    assert_matches_full_read(version, path)
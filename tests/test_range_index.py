@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.range_index import RangeStatsIndex
+from core.stats import summarize
+
+
+def sales(n, seed, distinct=None):
+    # Dates non triées et répétées ; ``distinct`` limite les valeurs possibles (beaucoup d'égalités)
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, n // 3 + 1, n), unit="D")
+    values = rng.integers(0, distinct, n).astype(float) if distinct else rng.normal(1000, 300, n).round(2)
+    return pd.DataFrame({"Date": dates, "Sales Revenue": values})
+
+
+def intervals(n, seed, count=60):
+    rng = np.random.default_rng(seed)
+    # Intervalles aléatoires, plus quelques-uns calés sur les blocs de la sparse table
+    block = RangeStatsIndex.BLOCK
+    edges = [(0, n), (0, 1), (n - 1, n), (block - 1, block + 1), (block, 2 * block), (1, 3 * block + 5)]
+    edges = [(lo, min(hi, n)) for lo, hi in edges if lo < min(hi, n)]
+    return edges + [tuple(sorted(rng.integers(0, n + 1, 2))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("n, distinct", [(1, None), (300, 4), (1500, None), (1500, 10)])
+def test_wavelet_queries_match_brute_force(n, distinct):
+    index = RangeStatsIndex.from_frame(sales(n, n, distinct))
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[index.rank_order] = np.arange(n)
+    rng = np.random.default_rng(0)
+    for lo, hi in intervals(n, n):
+        if hi <= lo:
+            continue
+        window = np.sort(ranks[lo:hi])
+        for k in {0, (hi - lo) // 2, hi - lo - 1}:
+            assert index.kth_rank(lo, hi, k) == window[k]
+        limit = int(rng.integers(0, n + 1))
+        assert index.count_below(lo, hi, limit) == int((ranks[lo:hi] < limit).sum())
+        values = index.values[lo:hi]
+        for target in (values[0], values.mean(), rng.uniform(values.min() - 10, values.max() + 10)):
+            # Valeur la plus proche ; à égalité de distance, la première ligne
+            expected = lo + min(range(hi - lo), key=lambda i: (abs(values[i] - target), i))
+            assert index.nearest(lo, hi, target) == expected
+
+
+@pytest.mark.parametrize("seed, distinct", [(0, None), (1, 3), (2, 50)])
+def test_summary_matches_summarize(seed, distinct):
+    df = sales(2000, seed, distinct)
+    index = RangeStatsIndex.from_frame(df)
+    ordered = df.sort_values("Date", kind="stable", ignore_index=True)
+    rng = np.random.default_rng(seed)
+    dates = ordered["Date"]
+    for _ in range(40):
+        start, end = sorted(dates.iloc[rng.integers(0, len(df), 2)])
+        expected = summarize(ordered[dates.between(start, end)].reset_index(drop=True))
+        result = index.summary(start, end)
+        for key in ("count", "min", "min_date", "max", "max_date", "median", "mean_date", "median_date"):
+            assert result[key] == expected[key], key
+        assert result["mean"] == pytest.approx(expected["mean"])
+    assert index.summary("2100-01-01", "2100-12-31") is None
+    assert index.summary()["count"] == len(df)
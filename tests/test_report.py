@@ -0,0 +1,89 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.report import PARTIAL_YEAR, complete_years, covered_years, run, year_frame
+from core.rollups import Rollups
+
+THRESHOLDS = (20, 5, -5, -20)
+
+
+def monthly(start, periods, value=100.0):
+    dates = pd.date_range(start, periods=periods, freq="MS")
+    return pd.DataFrame({"Date": dates, "Sales Revenue": np.full(periods, value)})
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_unreadable_file_is_reported_not_raised(tmp_path, workers):
+    source = tmp_path / "ventes"
+    source.mkdir()
+    monthly("2020-01-01", 36).to_csv(source / "bon.csv", index=False)
+    (source / "corrompu.xlsx").write_bytes(b"pas un classeur")
+    (source / "vide.csv").write_text("Date,Sales Revenue\n")
+
+    summary = run(sorted(str(path) for path in source.iterdir()), str(tmp_path / "rapports"),
+                  workers=workers, log=lambda message: None)
+
+    errors = dict(zip(summary["Fichier"], summary["Erreur"].fillna("")))
+    assert errors["bon.csv"] == ""
+    assert errors["corrompu.xlsx"]
+    assert errors["vide.csv"]
+    assert os.path.exists(tmp_path / "rapports" / "bon.xlsx")
+
+
+def test_partial_years_are_not_classified():
+    # 2020 commence en mars, 2024 s'arrête en janvier
+    rollups = Rollups.from_frame(monthly("2020-03-01", 47))
+    assert complete_years(rollups) == {2021, 2022, 2023}
+
+    years = year_frame(rollups, "ventes", THRESHOLDS).set_index("Année")
+    assert years.loc[[2020, 2024], "Catégorie"].eq(PARTIAL_YEAR).all()
+    assert years.loc[[2020, 2024], "Croissance (%)"].isna().all()
+    assert years.loc[2023, "Croissance (%)"] == 0
+    assert years.loc[2023, "Catégorie"] == "Stable"
+
+
+def test_summary_uses_last_complete_year(tmp_path):
+    source = tmp_path / "ventes"
+    source.mkdir()
+    df = monthly("2022-01-01", 25)
+    df.loc[df["Date"].dt.year == 2023, "Sales Revenue"] = 200.0
+    df.to_csv(source / "ventes.csv", index=False)
+
+    summary = run([str(source / "ventes.csv")], str(tmp_path / "rapports"), workers=1, log=lambda message: None)
+
+    row = summary.iloc[0]
+    assert row["Dernière année"] == 2023
+    assert row["Croissance (%)"] == pytest.approx(100.0)
+
+
+def test_unexpected_error_stays_in_its_file(tmp_path, monkeypatch):
+    def broken(path, *args):
+        raise RuntimeError("panne")
+
+    monkeypatch.setattr("core.report.build_report", broken)
+    summary = run([str(tmp_path / "ventes.csv")], str(tmp_path / "rapports"), workers=1, log=lambda message: None)
+    assert summary.iloc[0]["Erreur"] == "panne"
+
+
+def test_covered_years_from_date_bounds():
+    assert covered_years(datetime.date(2020, 1, 3), datetime.date(2024, 1, 1)) == {2020, 2021, 2022, 2023}
+    assert covered_years(datetime.date(2020, 2, 1), datetime.date(2020, 12, 31)) == set()
+    assert covered_years(None, None) == set()
+
+
+def test_missing_growth_is_written_as_blank_cells(tmp_path):
+    from openpyxl import load_workbook
+
+    source = tmp_path / "ventes"
+    source.mkdir()
+    monthly("2022-03-01", 20).to_csv(source / "ventes.csv", index=False)
+    run([str(source / "ventes.csv")], str(tmp_path / "rapports"), workers=1, log=lambda message: None)
+
+    book = load_workbook(tmp_path / "rapports" / "ventes.xlsx")
+    values = [cell.value for sheet in ("Évolution", "Années") for row in book[sheet].iter_rows() for cell in row]
+    assert None in values
+    assert not any(isinstance(value, str) and value.startswith("#") for value in values)
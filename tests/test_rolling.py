@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.rolling import RollingStats, WindowMedian, rolling_frame, rolling_table, year_over_year
+
+
+def days(n, seed, gaps=True, distinct=None):
+    # Série journalière à trous ; ``distinct`` limite les valeurs possibles (beaucoup d'égalités)
+    rng = np.random.default_rng(seed)
+    steps = rng.integers(1, 4, n) if gaps else np.ones(n, dtype=int)
+    dates = pd.Timestamp("2019-01-01") + pd.to_timedelta(np.cumsum(steps), unit="D")
+    values = rng.integers(0, distinct, n).astype(float) if distinct else rng.normal(1000, 300, n)
+    return pd.Series(values, index=pd.DatetimeIndex(dates))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_window_median_matches_sorted_window(seed):
+    rng = np.random.default_rng(seed)
+    median, values = WindowMedian(), []
+    for _ in range(3000):
+        if values and rng.random() < 0.45:
+            value = values.pop(int(rng.integers(len(values))))
+            median.remove(value)
+        else:
+            value = float(rng.integers(0, 8))
+            values.append(value)
+            median.add(value)
+        if values:
+            assert median.median() == np.median(values)
+            assert len(median) == len(values)
+    # Les valeurs retirées ne s'accumulent pas dans les tas
+    assert len(median.low) + len(median.high) <= 2 * len(values) + 32
+
+
+@pytest.mark.parametrize("window", [1, 7, 30, 365])
+@pytest.mark.parametrize("distinct", [None, 5])
+def test_rolling_matches_pandas(window, distinct):
+    series = days(1500, window, distinct=distinct)
+    result = rolling_frame(series, window, chunk_size=97)
+    rolling = series.rolling(f"{window}D")
+    np.testing.assert_allclose(result["Moyenne"], rolling.mean())
+    np.testing.assert_array_equal(result["Médiane"], rolling.median())
+    np.testing.assert_array_equal(result["Minimum"], rolling.min())
+    np.testing.assert_array_equal(result["Maximum"], rolling.max())
+    np.testing.assert_array_equal(result["Jours"], rolling.count())
+    assert (result["Date"].to_numpy() == series.index.to_numpy()).all()
+
+
+def test_chunks_give_the_same_result_as_one_pass():
+    series = days(800, 3)
+    one_pass = rolling_frame(series, 30, chunk_size=len(series))
+    for chunk_size in (1, 13, 400):
+        pd.testing.assert_frame_equal(rolling_frame(series, 30, chunk_size=chunk_size), one_pass)
+
+
+def test_missing_values_are_ignored():
+    series = days(50, 4, gaps=False)
+    with_gaps = series.copy()
+    with_gaps.iloc[::7] = np.nan
+    result = RollingStats(10).update(with_gaps.index, with_gaps.to_numpy())
+    expected = with_gaps.dropna().rolling("10D")
+    np.testing.assert_allclose(result["Moyenne"], expected.mean())
+    np.testing.assert_array_equal(result["Médiane"], expected.median())
+
+
+def test_dates_must_increase_across_chunks():
+    stats = RollingStats(5)
+    stats.update(pd.to_datetime(["2024-01-01", "2024-01-02"]), [1.0, 2.0])
+    with pytest.raises(ValueError):
+        stats.update(pd.to_datetime(["2024-01-02"]), [3.0])
+    with pytest.raises(ValueError):
+        RollingStats(0)
+
+
+def test_year_over_year_compares_with_the_window_a_year_earlier():
+    series = days(900, 5)
+    result = rolling_frame(series, 30)
+    totals = series.rolling("30D").sum()
+    growth = year_over_year(result)
+    for position in range(0, len(series), 37):
+        date = series.index[position]
+        previous = totals[:date - pd.DateOffset(years=1)]
+        expected = (totals.iloc[position] - previous.iloc[-1]) / previous.iloc[-1] * 100 if len(previous) else np.nan
+        np.testing.assert_allclose(growth[position], expected)
+
+
+def test_rolling_table_reads_day_totals_only_on_a_cache_miss():
+    calls = []
+
+    def day_totals():
+        calls.append(1)
+        return pd.Series([1.0, 2.0, 3.0], index=pd.date_range("2024-01-01", periods=3))
+
+    key = ("test", "jours", id(calls))
+    first = rolling_table(key, 2, day_totals)
+    second = rolling_table(key, 2, day_totals)
+    assert second is first and len(calls) == 1
+    rolling_table(key, 3, day_totals)
+    assert len(calls) == 2
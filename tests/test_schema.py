@@ -0,0 +1,57 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from core.schema import detect_date_format, normalize, parse_dates
+
+
+def dates(*values, dtype="string"):
+    return pd.Series(values, dtype=dtype)
+
+
+def test_day_first_dates_are_read_with_one_format():
+    parsed = parse_dates(dates("01/02/2024", "13/02/2024", None))
+    assert parsed.tolist()[:2] == [pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-13")]
+    assert pd.isna(parsed.iloc[2])
+
+
+def test_ambiguous_column_is_read_day_first():
+    assert detect_date_format(dates("01/02/2024", "03/04/2024")) == "%d/%m/%Y"
+
+
+def test_month_first_only_when_day_first_cannot_read_every_date():
+    assert parse_dates(dates("01/13/2024", "02/01/2024")).tolist() == [
+        pd.Timestamp("2024-01-13"), pd.Timestamp("2024-02-01")]
+
+
+def test_dates_off_the_column_format_are_rejected_not_guessed():
+    df = pd.DataFrame({"Date": dates("2024-01-01", "01/02/2024", "2024-03-04", "n/a"),
+                       "Sales Revenue": [1.0, 2.0, 3.0, 4.0]})
+    frame, rejected = normalize(df)
+    assert frame["Date"].tolist() == [pd.Timestamp("2024-01-01"), pd.Timestamp("2024-03-04")]
+    assert rejected.index.tolist() == [1, 3]
+
+
+def test_excel_cells_keep_their_dates():
+    column = dates(datetime.datetime(2024, 1, 5), "13/02/2024", None, dtype=object)
+    assert parse_dates(column).tolist()[:2] == [pd.Timestamp("2024-01-05"), pd.Timestamp("2024-02-13")]
+
+
+def test_raise_reports_row_numbers():
+    df = pd.DataFrame({"Date": dates("2024-01-01", "bad"), "Sales Revenue": [1.0, 2.0]})
+    with pytest.raises(ValueError, match="par exemple les lignes 2"):
+        normalize(df, errors="raise")
+
+
+def test_dates_with_a_utc_offset_are_read_as_utc():
+    parsed = parse_dates(dates("2024-01-01T10:00:00Z", "2024-01-02T10:00:00+02:00", "2024-01-03"))
+    assert parsed.dtype == "datetime64[ns]"
+    assert parsed.tolist() == [pd.Timestamp("2024-01-01 10:00"), pd.Timestamp("2024-01-02 08:00"),
+                               pd.Timestamp("2024-01-03")]
+
+
+def test_tz_aware_columns_are_made_naive():
+    column = pd.Series(pd.to_datetime(["2024-01-01T10:00:00+01:00"], utc=True))
+    frame, rejected = normalize(pd.DataFrame({"Date": column, "Sales Revenue": [1.0]}))
+    assert frame["Date"].tolist() == [pd.Timestamp("2024-01-01 09:00")] and rejected.empty
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.stats import summarize
+from core.ingest import merge_frames
+from core.store import DatasetStore, StoredDataset
+from core.table import sort_index
+
+
+@pytest.fixture
+def store():
+    return DatasetStore(":memory:")
+
+
+def sales(n, seed):
+    # Peu de dates et de valeurs distinctes : beaucoup d'égalités à départager
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Date": pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 60, n), unit="D"),
+        "Sales Revenue": rng.integers(0, 20, n).astype("float64"),
+    })
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_summary_matches_summarize(store, seed):
+    df = sales(300, seed)
+    dataset_id = store.ingest("ventes", df)
+    rng = np.random.default_rng(seed)
+    for _ in range(20):
+        start, end = sorted(pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 60, 2), unit="D"))
+        expected = summarize(df[df["Date"].between(start, end)].reset_index(drop=True))
+        result = store.summary(dataset_id, start, end)
+        if expected is None:
+            assert result is None
+            continue
+        for key in ("count", "min", "min_date", "max", "max_date", "median", "mean_date", "median_date"):
+            assert result[key] == expected[key], key
+        assert result["mean"] == pytest.approx(expected["mean"])
+
+
+@pytest.mark.parametrize("column", ["Date", "Sales Revenue"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_page_follows_sort_index_order(store, column, descending):
+    df = sales(250, 7)
+    dataset_id = store.ingest("ventes", df)
+    order, _ = sort_index(("test", column), column, df)
+    order = order[::-1] if descending else order
+    for offset in (0, 100, 200):
+        page = store.page(dataset_id, column, descending, limit=100, offset=offset)
+        expected = df.iloc[order[offset:offset + 100]].reset_index(drop=True)
+        pd.testing.assert_frame_equal(page, expected, check_dtype=False)
+
+
+def test_page_and_count_filter_dates(store):
+    df = sales(250, 3)
+    dataset_id = store.ingest("ventes", df)
+    start, end = pd.Timestamp("2021-01-10"), pd.Timestamp("2021-01-20")
+    selected = df[df["Date"].between(start, end)]
+    assert store.count(dataset_id, start, end) == len(selected)
+    page = store.page(dataset_id, "Sales Revenue", start=start, end=end, limit=len(df))
+    assert sorted(page["Sales Revenue"]) == sorted(selected["Sales Revenue"])
+    assert page["Date"].between(start, end).all()
+
+
+def test_bounds_and_frame_round_trip(store):
+    df = sales(100, 1)
+    dataset_id = store.ingest("ventes", df)
+    assert store.bounds(dataset_id) == (df["Date"].min().date(), df["Date"].max().date())
+    pd.testing.assert_frame_equal(store.frame(dataset_id), df, check_dtype=False)
+    # Même contenu : pas de nouvelle version
+    assert store.ingest("ventes", df) == dataset_id
+
+
+def test_entities_are_stored_and_filter_queries(store):
+    frames = {"a.csv": sales(50, 2), "b.csv": sales(30, 3)}
+    merged = merge_frames(frames, by_file=True).frame
+    dataset_id = store.ingest("magasins", merged)
+    assert store.entities(dataset_id) == ["a.csv", "b.csv"]
+    assert store.count(dataset_id) == 80
+    a = StoredDataset(store, dataset_id, "a.csv")
+    assert a.count() == 50
+    # Ordre d'import : celui de la série fusionnée (triée par date)
+    assert a.summary() == summarize(merged[merged["Fichier"] == "a.csv"])
+    assert a.year_totals().sum() == frames["a.csv"]["Sales Revenue"].sum()
+    assert set(store.frame(dataset_id)["Fichier"]) == {"a.csv", "b.csv"}
+    assert "Fichier" not in store.frame(store.ingest("ventes", frames["a.csv"]))